@@ -0,0 +1,193 @@
+"""Benchmarks for the ledger's hot paths as history grows.
+
+For each size a synthetic ledger (bench_startup.write_ledger: oldest month first,
+~300 rows a month, weighted categories) is written to a temp directory, then every
+operation below is timed on BudgetLedger, which is what BudgetApp runs underneath:
+
+  load                 CSV snapshot + journal into memory, totals summed from the rows
+  load_cached          the same with the totals read from the snapshot's rollup file
+  rebuild_month_list   ledger.months()
+  update_totals        totals for the newest month and for "All"
+  refresh_table        ids for the newest month and "All" + one table window of rows
+  add                  one expense (journal fsync included)
+  delete_selected      delete 10 rows from the middle of the ledger
+  save                 fold the journal into a new snapshot
+  report               full per-month / per-category report
+
+Each value is the best of --repeat runs, in seconds. With --tk the same calls are also
+timed through a withdrawn BudgetApp (needs a display; skipped with a note otherwise).
+
+    python bench_ledger.py [--sizes 1000 10000 100000 1000000] [--out report.json]
+                           [--compare old.json] [--tk]
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench_startup import write_ledger
+from budget_aggregate import have_numpy
+from budget_ledger import BudgetLedger, make_tx
+from budget_rollup import rollup_path
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+WINDOW = 30  # rows materialized per table refresh (TABLE_HEIGHT + VIRTUAL_BUFFER in the app)
+REGRESSION = 1.2  # --compare flags operations this much slower than the baseline
+NOISE_FLOOR = 0.001  # ...and at least this many seconds slower, so microsecond jitter is ignored
+
+
+def best_of(repeat: int, fn, setup=None) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench_ledger(data_file: Path, repeat: int) -> dict:
+    out = {}
+    ledger = BudgetLedger(data_file)
+    # each load writes a rollup when there is none, so it is removed for "load"
+    out["load"] = best_of(repeat, ledger.load, setup=lambda: rollup_path(data_file).unlink(missing_ok=True))
+    out["load_cached"] = best_of(repeat, ledger.load)
+    latest = ledger.months()[0]
+
+    def refresh():
+        for month in (latest, "All"):
+            ids = ledger.ids(month)
+            for _, tx in ledger.rows(ids[:WINDOW]):
+                (tx["date"], tx["type"], f'{tx["amount"]:.2f}', tx["category"], tx["note"])
+
+    out["rebuild_month_list"] = best_of(repeat, ledger.months)
+    out["update_totals"] = best_of(repeat, lambda: (ledger.totals(latest), ledger.totals("All")))
+    out["refresh_table"] = best_of(repeat, refresh)
+
+    tx = make_tx("01-15-2024", "Expense", "12.34", "Dining", "bench")
+    out["add"] = best_of(repeat, lambda: ledger.add(tx))
+    middle = len(ledger) // 2
+    out["delete_selected"] = best_of(repeat, lambda: ledger.delete(range(middle, middle + 10)))
+    # a save with nothing new in the journal is a no-op, so each run gets one fresh change first
+    out["save"] = best_of(repeat, ledger.save, setup=lambda: ledger.add(tx))
+    out["report"] = best_of(repeat, ledger.report)
+    assert not ledger.check_totals()
+    ledger.close()
+    return out
+
+
+def bench_tk(data_file: Path, repeat: int) -> dict:
+    try:
+        import budget_app_monthly_v4 as v4
+        from tkinter import messagebox
+
+        v4.DATA_FILE = data_file
+        messagebox.showinfo = lambda *a, **k: None  # load() reports an empty ledger through a dialog
+        t0 = time.perf_counter()
+        app = v4.BudgetApp()
+    except Exception as e:  # no display
+        return {"error": str(e)}
+    app.withdraw()
+    started = False
+    while True:
+        app.update()
+        if app.load_state == "loading":
+            started = True
+        elif started or app.load_state == "ready" and app.ledger.transactions:
+            break
+    out = {"load": time.perf_counter() - t0}
+    out["rebuild_month_list"] = best_of(repeat, app.rebuild_month_list)
+    out["update_totals"] = best_of(repeat, app.update_totals)
+
+    def refresh_all():
+        app.month_var.set("All")
+        app.refresh_table()
+        app.update_idletasks()
+
+    out["refresh_table"] = best_of(repeat, refresh_all)
+
+    def select_middle():
+        app.refresh_table()
+        children = app.tree.get_children()
+        app.tree.selection_set(children[len(children) // 2:len(children) // 2 + 10])
+
+    out["delete_selected"] = best_of(repeat, app.delete_selected, setup=select_middle)
+
+    def dirty():
+        app.ledger.add(make_tx("01-15-2024", "Expense", "12.34", "Dining", "bench"))
+
+    # save() only starts the background write; time it through to the rename
+    out["save"] = best_of(repeat, lambda: (app.save(), app.ledger.journal.wait()), setup=dirty)
+    app.on_close()
+    return out
+
+
+def run(rows: int, repeat: int, tk: bool) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = Path(tmp) / "budget_data.csv"
+        write_ledger(data_file, rows)
+        result = {"rows": rows, "ledger": bench_ledger(data_file, repeat)}
+        if tk:
+            result["tk"] = bench_tk(data_file, repeat)
+    return result
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).resolve().parent,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(old: dict, new: dict) -> list:
+    """Return "rows/section/op: old -> new" lines for operations that got REGRESSION times slower."""
+    before = {(r["rows"], section, op): t
+              for r in old["results"] for section in ("ledger", "tk")
+              for op, t in r.get(section, {}).items() if isinstance(t, float)}
+    slower = []
+    for r in new["results"]:
+        for section in ("ledger", "tk"):
+            for op, t in r.get(section, {}).items():
+                base = before.get((r["rows"], section, op))
+                if isinstance(t, float) and base and t > base * REGRESSION and t - base > NOISE_FLOOR:
+                    slower.append(f"{r['rows']}/{section}/{op}: {base:.6f}s -> {t:.6f}s ({t / base:.2f}x)")
+    return slower
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Time the ledger's hot paths at several sizes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tk", action="store_true", help="also time a withdrawn BudgetApp")
+    parser.add_argument("--out", type=Path, help="write the JSON report here as well as to stdout")
+    parser.add_argument("--compare", type=Path, help="earlier report; exit 1 if anything regressed")
+    args = parser.parse_args(argv)
+
+    report = {
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "numpy": have_numpy(),
+        "results": [run(n, args.repeat, args.tk) for n in args.sizes],
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        args.out.write_text(text + "\n", encoding="utf-8")
+    if args.compare:
+        slower = compare(json.loads(args.compare.read_text(encoding="utf-8")), report)
+        for line in slower:
+            print("slower:", line, file=sys.stderr)
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""Benchmark for budget_multi: serial ledger loads vs. the process pool.
+
+Writes --files synthetic ledgers (bench_startup.write_ledger, a different seed each)
+of --rows rows to a temp directory, then times (best of --repeat, in seconds):
+
+  serial        BudgetLedger(file).load() for each file in turn, the way BudgetApp
+                loads one, with the running totals merged afterwards
+  workers=N     budget_multi.aggregate(files, N) for N = 1, 2, 4, ... up to --workers
+
+speedup is serial / parallel; efficiency is speedup / N, which stays near 1.0 while
+the pool scales linearly. Every run's totals are checked against the serial ones.
+
+    python bench_multi.py [--files 16] [--rows 100000] [--workers N] [--out report.json]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+from math import isclose
+from pathlib import Path
+
+from bench_ledger import best_of
+from bench_startup import write_ledger
+from budget_aggregate import have_numpy, merge_groups
+from budget_ledger import BudgetLedger
+from budget_multi import aggregate
+from budget_rollup import rollup_path
+
+
+def serial_groups(files) -> dict:
+    parts = []
+    for path in files:
+        ledger = BudgetLedger(path)
+        ledger.load()
+        parts.append(ledger.category_totals)
+        ledger.close()
+    return merge_groups(parts)
+
+
+def same_totals(a: dict, b: dict) -> bool:
+    return a.keys() == b.keys() and all(isclose(a[k], b[k], rel_tol=1e-9, abs_tol=1e-6) for k in a)
+
+
+def worker_counts(most: int) -> list:
+    counts, n = [], 1
+    while n < most:
+        counts.append(n)
+        n *= 2
+    return counts + [most]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare serial ledger loads with parallel aggregation.")
+    parser.add_argument("--files", type=int, default=16)
+    parser.add_argument("--rows", type=int, default=100_000, help="rows per file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="largest pool to time")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", type=Path, help="write the JSON report here as well as to stdout")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = [Path(tmp) / f"household_{i:03d}.csv" for i in range(args.files)]
+        for seed, path in enumerate(files, start=1):
+            write_ledger(path, args.rows, seed=seed)
+
+        def drop_rollups():
+            # a load saves the totals next to each file; parse every time, like the pool does
+            for path in files:
+                rollup_path(path).unlink(missing_ok=True)
+
+        drop_rollups()
+        expected = serial_groups(files)
+        serial = best_of(args.repeat, lambda: serial_groups(files), setup=drop_rollups)
+        parallel = {}
+        for n in worker_counts(args.workers):
+            _, groups = aggregate(files, n)
+            if not same_totals(groups, expected):
+                print(f"error: totals with {n} workers differ from the serial load", file=sys.stderr)
+                return 1
+            t = best_of(args.repeat, lambda: aggregate(files, n))
+            parallel[n] = {"seconds": t, "speedup": serial / t, "efficiency": serial / t / n}
+
+    report = {
+        "python": platform.python_version(),
+        "numpy": have_numpy(),
+        "cpus": os.cpu_count(),
+        "files": args.files,
+        "rows_per_file": args.rows,
+        "serial": serial,
+        "workers": parallel,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        args.out.write_text(text + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
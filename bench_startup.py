@@ -0,0 +1,92 @@
+"""Time-to-first-window benchmark for budget_app_monthly_v4.
+
+Each run starts a fresh interpreter with HOME pointed at a temp directory holding a
+synthetic budget_data.csv, then reports (in seconds):
+  import   importing the module
+  window   BudgetApp() returning with its empty window drawn
+  preview  first rows visible in the table
+  ready    every row loaded and editable
+
+Usage: python bench_startup.py [rows ...]    (needs a display for everything past "import")
+"""
+import csv
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+DEFAULT_SIZES = [10_000, 100_000, 500_000]
+CATEGORIES = ["Groceries", "Dining", "Gas", "Bills", "Shopping", "Health", "Entertainment", "Other"]
+CATEGORY_WEIGHTS = [30, 18, 12, 8, 14, 5, 8, 5]  # rough share of expense rows per category
+
+CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import budget_app_monthly_v4 as v4
+out = {"import": time.perf_counter() - t0}
+try:
+    app = v4.BudgetApp()
+except Exception as e:  # no display
+    out["error"] = str(e)
+    print(json.dumps(out))
+    sys.exit()
+app.update()
+out["window"] = time.perf_counter() - t0
+started = False
+while True:
+    app.update()
+    if "preview" not in out and app.tree.get_children():
+        out["preview"] = time.perf_counter() - t0
+    if app.load_state == "loading":
+        started = True
+    elif started:
+        break
+out.setdefault("preview", time.perf_counter() - t0)
+out["ready"] = time.perf_counter() - t0
+app.destroy()
+print(json.dumps(out))
+"""
+
+
+def write_ledger(path: Path, rows: int, seed: int = 1):
+    rng = random.Random(seed)
+    # oldest first, like a ledger that has been appended to for years
+    months = max(rows // 300, 1)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["date", "type", "amount", "category", "note"])
+        for i in range(rows):
+            m = i * months // rows
+            date = f"{m % 12 + 1:02d}-{rng.randint(1, 28):02d}-{2000 + m // 12}"
+            if rng.random() < 0.1:
+                writer.writerow([date, "Income", f"{rng.uniform(500, 3000):.2f}", "Income", ""])
+            else:
+                category = rng.choices(CATEGORIES, CATEGORY_WEIGHTS)[0]
+                writer.writerow([date, "Expense", f"{rng.uniform(1, 200):.2f}", category, "note"])
+
+
+def run(rows: int) -> dict:
+    with tempfile.TemporaryDirectory() as home:
+        app_dir = Path(home) / "BudgetApp"
+        app_dir.mkdir()
+        write_ledger(app_dir / "budget_data.csv", rows)
+        env = dict(os.environ, HOME=home, USERPROFILE=home)
+        proc = subprocess.run(
+            [sys.executable, "-c", CHILD],
+            cwd=Path(__file__).resolve().parent,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        result["rows"] = rows
+        return result
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or DEFAULT_SIZES
+    print(json.dumps([run(n) for n in sizes], indent=2))
@@ -0,0 +1,126 @@
+from budget_store import CodeTable, TransactionStore
+
+_np = None  # numpy module once imported, False if it isn't installed
+
+
+def _numpy():
+    # NumPy costs ~100 ms to import, so it is only pulled in the first time totals are rebuilt
+    global _np
+    if _np is None:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:  # optional; the pure-Python path gives the same numbers
+            _np = False
+    return _np
+
+
+def have_numpy() -> bool:
+    return bool(_numpy())
+
+
+def _month_codes_by_date(store: TransactionStore, month_key):
+    # month_key runs once per distinct date string, not once per row
+    months = CodeTable()
+    by_date = [months.code(month_key(d)) for d in store.dates.values]
+    return months, by_date
+
+
+def _group_totals_numpy(store: TransactionStore, month_key) -> dict:
+    np = _numpy()
+    months, by_date = _month_codes_by_date(store, month_key)
+    date_codes = np.frombuffer(store.date_codes, dtype=store.date_codes.typecode)
+    type_codes = np.frombuffer(store.type_codes, dtype=store.type_codes.typecode).astype(np.int64)
+    cat_codes = np.frombuffer(store.category_codes, dtype=store.category_codes.typecode).astype(np.int64)
+    amounts = np.frombuffer(store.amounts, dtype=np.float64)
+
+    n_types = len(store.types.values)
+    n_cats = max(len(store.categories.values), 1)
+    month_codes = np.asarray(by_date, dtype=np.int64)[date_codes]
+    keys = (month_codes * n_types + type_codes) * n_cats + cat_codes
+
+    # bincount adds weights in row order, exactly like the Python loop below
+    groups, inverse = np.unique(keys, return_inverse=True)
+    sums = np.bincount(inverse.ravel(), weights=amounts, minlength=len(groups))
+
+    totals = {}
+    for key, amount in zip(groups.tolist(), sums.tolist()):
+        key, c = divmod(key, n_cats)
+        m, t = divmod(key, n_types)
+        totals[(months.values[m], store.types.values[t], store.categories.values[c])] = amount
+    return totals
+
+
+def _group_totals_python(transactions, month_key) -> dict:
+    totals = {}
+    if isinstance(transactions, TransactionStore):
+        months, by_date = _month_codes_by_date(transactions, month_key)
+        types, cats = transactions.types.values, transactions.categories.values
+        rows = zip(transactions.date_codes, transactions.type_codes, transactions.category_codes, transactions.amounts)
+        for d, t, c, amount in rows:
+            key = (months.values[by_date[d]], types[t], cats[c])
+            totals[key] = totals.get(key, 0.0) + amount
+        return totals
+
+    for tx in transactions:
+        key = (month_key(tx["date"]), tx["type"], tx["category"])
+        totals[key] = totals.get(key, 0.0) + tx["amount"]
+    return totals
+
+
+def group_totals(transactions, month_key, use_numpy=True) -> dict:
+    """Return {(month, type, category): total} over every transaction.
+
+    Uses NumPy grouped reductions when it is installed and transactions is a
+    TransactionStore; use_numpy=False forces the pure-Python path.
+    """
+    if use_numpy and isinstance(transactions, TransactionStore) and len(transactions) and have_numpy():
+        return _group_totals_numpy(transactions, month_key)
+    return _group_totals_python(transactions, month_key)
+
+
+def rollup(groups: dict):
+    """Fold (month, type, category) totals into ({(month, type): total}, {type: total})."""
+    month_totals = {}
+    grand_totals = {"Income": 0.0, "Expense": 0.0}
+    for (month, tx_type, _category), amount in sorted(groups.items()):
+        month_totals[(month, tx_type)] = month_totals.get((month, tx_type), 0.0) + amount
+        grand_totals[tx_type] = grand_totals.get(tx_type, 0.0) + amount
+    return month_totals, grand_totals
+
+
+def merge_groups(parts) -> dict:
+    """Sum several group_totals() results (e.g. one per ledger file) into one, in the given order."""
+    totals = {}
+    for groups in parts:
+        for key, amount in groups.items():
+            totals[key] = totals.get(key, 0.0) + amount
+    return totals
+
+
+def report(transactions, month_key, use_numpy=True) -> dict:
+    """Monthly totals, per-category expense breakdowns and running balance, oldest month first."""
+    return report_from_groups(group_totals(transactions, month_key, use_numpy))
+
+
+def report_from_groups(groups: dict) -> dict:
+    """report() for totals that were already grouped by (month, type, category)."""
+    month_totals, _ = rollup(groups)
+
+    months = sorted({m for m, _ in month_totals})
+    by_month = {}
+    balance = 0.0
+    balance_over_time = []
+    for m in months:
+        income = month_totals.get((m, "Income"), 0.0)
+        expenses = month_totals.get((m, "Expense"), 0.0)
+        balance += income - expenses
+        by_month[m] = {"income": income, "expenses": expenses, "balance": income - expenses}
+        balance_over_time.append((m, balance))
+
+    categories = {}
+    for (m, tx_type, category), amount in sorted(groups.items()):
+        if tx_type == "Expense":
+            categories.setdefault(m, {})[category] = amount
+
+    return {"months": by_month, "categories": categories, "balance_over_time": balance_over_time}
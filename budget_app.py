@@ -4,6 +4,8 @@ import csv
 from datetime import datetime
 from pathlib import Path
 
+from budget_rows import StableRows
+
 APP_DIR = Path.home() / "BudgetApp"
 APP_DIR.mkdir(exist_ok=True)
 DATA_FILE = APP_DIR / "budget_data.csv"
@@ -15,7 +17,8 @@ class BudgetApp(tk.Tk):
         self.title("Budget Tracker")
         self.resizable(False, False)
 
-        self.transactions = []  # list of dicts
+        self.transactions = StableRows()  # tx dicts; their stable ids double as Treeview iids
+        self.totals = {"Income": 0.0, "Expense": 0.0}  # running sums, kept in step with every add/delete
 
         # --- Top: Income entry ---
         top = ttk.Frame(self, padding=12)
@@ -106,10 +109,12 @@ class BudgetApp(tk.Tk):
         return float(t)
 
     def _add_transaction(self, tx: dict):
-        self.transactions.append(tx)
+        tx_id = self.transactions.add(tx)
+        self.totals[tx["type"]] += tx["amount"]
         self.tree.insert(
             "",
             tk.END,
+            iid=str(tx_id),
             values=(tx["date"], tx["type"], f'{tx["amount"]:.2f}', tx["category"], tx["note"]),
         )
         self.update_totals()
@@ -155,20 +160,17 @@ class BudgetApp(tk.Tk):
         selected = self.tree.selection()
         if not selected:
             return
-        # delete from bottom up so indices don't shift weirdly
-        for item_id in selected:
-            vals = self.tree.item(item_id, "values")
-            self.tree.delete(item_id)
-            # remove matching tx from list (first match)
-            for i, tx in enumerate(self.transactions):
-                if (tx["date"], tx["type"], f'{tx["amount"]:.2f}', tx["category"], tx["note"]) == vals:
-                    self.transactions.pop(i)
-                    break
+        # iids are transaction ids, so each row is found directly instead of by searching
+        self.tree.delete(*selected)
+        for tx in self.transactions.delete(int(item_id) for item_id in selected):
+            self.totals[tx["type"]] -= tx["amount"]
+        if not self.transactions:
+            self.totals = {"Income": 0.0, "Expense": 0.0}  # no float residue on an empty ledger
         self.update_totals()
 
     def update_totals(self):
-        income = sum(tx["amount"] for tx in self.transactions if tx["type"] == "Income")
-        expenses = sum(tx["amount"] for tx in self.transactions if tx["type"] == "Expense")
+        income = self.totals["Income"]
+        expenses = self.totals["Expense"]
         balance = income - expenses
         self.income_total_var.set(f"{income:.2f}")
         self.expense_total_var.set(f"{expenses:.2f}")
@@ -188,8 +190,8 @@ class BudgetApp(tk.Tk):
     def load(self):
         try:
             self.transactions.clear()
-            for row in self.tree.get_children():
-                self.tree.delete(row)
+            self.totals = {"Income": 0.0, "Expense": 0.0}
+            self.tree.delete(*self.tree.get_children())
 
             if not DATA_FILE.exists():
                 messagebox.showinfo("No data", "No saved data found yet.")
@@ -205,8 +207,14 @@ class BudgetApp(tk.Tk):
                         "category": r["category"],
                         "note": r["note"],
                     }
-                    self.transactions.append(tx)
-                    self.tree.insert("", tk.END, values=(tx["date"], tx["type"], f'{tx["amount"]:.2f}', tx["category"], tx["note"]))
+                    tx_id = self.transactions.add(tx)
+                    self.totals[tx["type"]] += tx["amount"]
+                    self.tree.insert(
+                        "",
+                        tk.END,
+                        iid=str(tx_id),
+                        values=(tx["date"], tx["type"], f'{tx["amount"]:.2f}', tx["category"], tx["note"]),
+                    )
 
             self.update_totals()
         except Exception as e:
@@ -4,6 +4,8 @@ import csv
 from datetime import datetime
 from pathlib import Path
 
+from budget_rows import StableRows
+
 APP_DIR = Path.home() / "BudgetApp"
 APP_DIR.mkdir(exist_ok=True)
 DATA_FILE = APP_DIR / "budget_data.csv"
@@ -15,7 +17,9 @@ class BudgetApp(tk.Tk):
         self.title("Budget Tracker (Monthly View)")
         self.resizable(False, False)
 
-        self.transactions = []  # list of dicts
+        self.transactions = StableRows()  # tx dicts; their stable ids double as Treeview iids
+        self.month_totals = {}  # (month, type) -> running amount
+        self.month_counts = {}  # month -> number of rows, so the month list needs no scan
 
         # --- Top: Income entry ---
         top = ttk.Frame(self, padding=12)
@@ -125,14 +129,26 @@ class BudgetApp(tk.Tk):
     def current_filter(self) -> str:
         return self.month_var.get()
 
+    def _track(self, tx: dict, sign: int):
+        # sign is +1 when a row is added and -1 when it is deleted
+        month = self.month_key(tx["date"])
+        key = (month, tx["type"])
+        self.month_totals[key] = self.month_totals.get(key, 0.0) + sign * tx["amount"]
+        self.month_counts[month] = self.month_counts.get(month, 0) + sign
+        if not self.month_counts[month]:
+            del self.month_counts[month]
+            self.month_totals.pop((month, "Income"), None)
+            self.month_totals.pop((month, "Expense"), None)
+
     def filtered_transactions(self):
+        """(id, tx) pairs in the current month filter."""
         m = self.current_filter()
         if m == "All":
-            return list(self.transactions)
-        return [tx for tx in self.transactions if self.month_key(tx["date"]) == m]
+            return list(self.transactions.items())
+        return [(tx_id, tx) for tx_id, tx in self.transactions.items() if self.month_key(tx["date"]) == m]
 
     def rebuild_month_list(self):
-        months = sorted({self.month_key(tx["date"]) for tx in self.transactions}, reverse=True)
+        months = sorted(self.month_counts, reverse=True)
         values = ["All"] + months
         self.month_menu["values"] = values
         # If current selection vanished, reset
@@ -141,14 +157,14 @@ class BudgetApp(tk.Tk):
 
     def refresh_table(self):
         # clear table
-        for row in self.tree.get_children():
-            self.tree.delete(row)
+        self.tree.delete(*self.tree.get_children())
 
         # insert filtered rows
-        for tx in self.filtered_transactions():
+        for tx_id, tx in self.filtered_transactions():
             self.tree.insert(
                 "",
                 tk.END,
+                iid=str(tx_id),
                 values=(tx["date"], tx["type"], f'{tx["amount"]:.2f}', tx["category"], tx["note"]),
             )
 
@@ -171,7 +187,8 @@ class BudgetApp(tk.Tk):
                 "category": "Income",
                 "note": "",
             }
-            self.transactions.append(tx)
+            self.transactions.add(tx)
+            self._track(tx, 1)
             self.income_entry.delete(0, tk.END)
             self.income_entry.focus_set()
 
@@ -193,7 +210,8 @@ class BudgetApp(tk.Tk):
                 "category": self.category.get(),
                 "note": self.note_entry.get().strip(),
             }
-            self.transactions.append(tx)
+            self.transactions.add(tx)
+            self._track(tx, 1)
             self.expense_entry.delete(0, tk.END)
             self.note_entry.delete(0, tk.END)
             self.expense_entry.focus_set()
@@ -208,27 +226,26 @@ class BudgetApp(tk.Tk):
         if not selected:
             return
 
-        # Build a set of row-values to remove
-        to_remove = set()
-        for item_id in selected:
-            vals = self.tree.item(item_id, "values")
-            to_remove.add(vals)
-
-        # Remove from the master list (match on displayed string values)
-        new_list = []
-        for tx in self.transactions:
-            row_vals = (tx["date"], tx["type"], f'{tx["amount"]:.2f}', tx["category"], tx["note"])
-            if row_vals not in to_remove:
-                new_list.append(tx)
-        self.transactions = new_list
+        # iids are transaction ids: exactly the selected rows go, even when two rows look alike
+        self.tree.delete(*selected)
+        for tx in self.transactions.delete(int(item_id) for item_id in selected):
+            self._track(tx, -1)
 
+        month = self.current_filter()
         self.rebuild_month_list()
-        self.refresh_table()
+        if self.current_filter() != month:
+            self.refresh_table()  # the month emptied out and the view fell back to All
+        else:
+            self.update_totals()
 
     def update_totals(self):
-        visible = self.filtered_transactions()
-        income = sum(tx["amount"] for tx in visible if tx["type"] == "Income")
-        expenses = sum(tx["amount"] for tx in visible if tx["type"] == "Expense")
+        m = self.current_filter()
+        if m == "All":
+            income = sum(amount for (_, t), amount in self.month_totals.items() if t == "Income")
+            expenses = sum(amount for (_, t), amount in self.month_totals.items() if t == "Expense")
+        else:
+            income = self.month_totals.get((m, "Income"), 0.0)
+            expenses = self.month_totals.get((m, "Expense"), 0.0)
         balance = income - expenses
         self.income_total_var.set(f"{income:.2f}")
         self.expense_total_var.set(f"{expenses:.2f}")
@@ -248,6 +265,8 @@ class BudgetApp(tk.Tk):
     def load(self):
         try:
             self.transactions.clear()
+            self.month_totals = {}
+            self.month_counts = {}
 
             if not DATA_FILE.exists():
                 messagebox.showinfo("No data", "No saved data found yet.")
@@ -265,7 +284,8 @@ class BudgetApp(tk.Tk):
                         "category": r["category"],
                         "note": r["note"],
                     }
-                    self.transactions.append(tx)
+                    self.transactions.add(tx)
+                    self._track(tx, 1)
 
             self.rebuild_month_list()
             # default to latest month (optional). Comment out if you prefer "All".
@@ -1,21 +1,61 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-import csv
+from tkinter import ttk, messagebox, filedialog
+import os
+import sys
 from datetime import datetime
 from pathlib import Path
 
-APP_DIR = Path.home() / "BudgetApp"
-APP_DIR.mkdir(exist_ok=True)
-DATA_FILE = APP_DIR / "budget_data.csv"
+from budget_binary import SUFFIX as BINARY_SUFFIX, read_latest_month
+from budget_import import StatementMapping, read_header, read_statement
+from budget_ledger import APP_DIR, CATEGORIES, DATA_FILE, BudgetLedger, LedgerChanged, make_tx, month_key, month_label
+from budget_loader import CsvStreamLoader
+from budget_profile import ENV_VAR as PROFILE_ENV, profiler
+from budget_search import parse_query
+
+TABLE_HEIGHT = 10  # rows the Treeview shows at once
+VIRTUAL_THRESHOLD = 1000  # above this many rows, only a window of them lives in the Treeview
+VIRTUAL_BUFFER = 20  # extra rows materialized below the visible window
+LOADER_POLL_MS = 30  # how often the UI picks up batches from the background CSV loader
+STATS_POLL_MS = 1000  # refresh rate of the timing stats window
+AUTOSAVE_MS = 2000  # quiet time after the last change before the snapshot is rewritten
+SAVE_POLL_MS = 100  # how often a background save is checked for completion
+CHANGE_POLL_MS = 1000  # how often to look for changes made by another window or the CLI
 
 
 class BudgetApp(tk.Tk):
-    def __init__(self):
+    def __init__(self, use_sqlite: bool = False):
         super().__init__()
         self.title("Budget Tracker (Monthly View)")
         self.resizable(False, False)
 
-        self.transactions = []  # list of dicts
+        # --- Tools menu: opt-in timings (also on from startup with BUDGET_PROFILE=1 or =cprofile) ---
+        profile_mode = os.environ.get(PROFILE_ENV, "")
+        if profile_mode and profile_mode != "0":
+            profiler.enable(APP_DIR / "profiles" if profile_mode == "cprofile" else None)
+        self.profile_var = tk.BooleanVar(value=profiler.enabled)
+        self.stats_win = None
+        self.option_add("*tearOff", False)
+        menubar = tk.Menu(self)
+        # Undo/Redo are greyed out when the ledger has nothing to replay, checked as the menu opens
+        edit_menu = tk.Menu(menubar, postcommand=self._update_edit_menu)
+        self.edit_menu = edit_menu
+        edit_menu.add_command(label="Undo", accelerator="Ctrl+Z", command=self.undo)
+        edit_menu.add_command(label="Redo", accelerator="Ctrl+Y", command=self.redo)
+        menubar.add_cascade(label="Edit", menu=edit_menu)
+        tools = tk.Menu(menubar)
+        tools.add_checkbutton(label="Record Timings", variable=self.profile_var, command=self.toggle_profiling)
+        tools.add_command(label="Timing Stats...", command=self.show_stats)
+        menubar.add_cascade(label="Tools", menu=tools)
+        self.config(menu=menubar)
+
+        # all data and bookkeeping lives in the ledger; this class only draws it
+        self.ledger = BudgetLedger(DATA_FILE, DATA_FILE.with_suffix(".db") if use_sqlite else None)
+        self.ledger.on_change = self._schedule_autosave
+        self.autosave_job = None
+        self.selection_generation = self.ledger.generation  # ledger.generation when the selection was made
+        self.edit_win = None
+        self.loader = None
+        self.load_state = "ready"  # "loading" while the CSV streams in, "cancelled" if the user stopped it
 
         # --- Top: Income entry ---
         top = ttk.Frame(self, padding=12)
@@ -36,6 +76,7 @@ class BudgetApp(tk.Tk):
         # --- Monthly filter row ---
         ttk.Label(top, text="View month:").grid(row=0, column=5, sticky="e", padx=6, pady=6)
         self.month_var = tk.StringVar(value="All")
+        self.month_keys = {}  # "MM-YYYY" label in the combobox -> month key
         self.month_menu = ttk.Combobox(top, textvariable=self.month_var, values=["All"], width=10, state="readonly")
         self.month_menu.grid(row=0, column=6, padx=6, pady=6)
         self.month_menu.bind("<<ComboboxSelected>>", lambda e: self.refresh_table())
@@ -58,7 +99,7 @@ class BudgetApp(tk.Tk):
         self.category_menu = ttk.Combobox(
             mid,
             textvariable=self.category,
-            values=["Groceries", "Dining", "Gas", "Bills", "Shopping", "Health", "Entertainment", "Other"],
+            values=CATEGORIES,
             width=16,
             state="readonly",
         )
@@ -70,14 +111,37 @@ class BudgetApp(tk.Tk):
 
         ttk.Button(mid, text="Add Expense", command=self.add_expense).grid(row=0, column=4, rowspan=2, padx=6, pady=6)
 
+        # --- Search: words in the note plus cat:/type:/amount:/date: terms (see budget_search) ---
+        ttk.Label(mid, text="Search:").grid(row=0, column=5, sticky="e", padx=6, pady=6)
+        self.search_entry = ttk.Entry(mid, width=32)
+        self.search_entry.grid(row=0, column=6, padx=6, pady=6)
+        self.search_entry.bind("<Return>", self._on_search_return)
+        ttk.Button(mid, text="Search", command=self.run_search).grid(row=0, column=7, padx=4, pady=6)
+        ttk.Button(mid, text="Clear", command=self.clear_search).grid(row=0, column=8, padx=4, pady=6)
+        self.search_query = None  # parsed query while a search is active
+
         # --- Table ---
         table_frame = ttk.Frame(self, padding=12)
         table_frame.grid(row=2, column=0, sticky="ew")
 
         cols = ("date", "type", "amount", "category", "note")
-        self.tree = ttk.Treeview(table_frame, columns=cols, show="headings", height=10)
+        self.tree = ttk.Treeview(table_frame, columns=cols, show="headings", height=TABLE_HEIGHT)
         self.tree.grid(row=0, column=0, sticky="nsew")
 
+        # Scrollbar drives the Treeview directly for small views and our row window in virtual mode
+        self.vscroll = ttk.Scrollbar(table_frame, orient="vertical", command=self._on_vscroll)
+        self.vscroll.grid(row=0, column=1, sticky="ns")
+        self.tree.configure(yscrollcommand=self._on_tree_yview)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", self._on_mousewheel)
+        self.tree.bind("<Button-5>", self._on_mousewheel)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+
+        self.view_rows = []  # transaction indices matching the current filter
+        self.view_top = 0  # position in view_rows of the first row shown (virtual mode)
+        self.virtual_mode = False
+        self.rendered = {}  # iid -> values currently in the Treeview
+
         self.tree.heading("date", text="Date")
         self.tree.heading("type", text="Type")
         self.tree.heading("amount", text="Amount")
@@ -111,67 +175,181 @@ class BudgetApp(tk.Tk):
         ttk.Button(bottom, text="Delete Selected", command=self.delete_selected).grid(row=0, column=7, padx=6, pady=4)
         ttk.Button(bottom, text="Save", command=self.save).grid(row=0, column=8, padx=6, pady=4)
         ttk.Button(bottom, text="Load", command=self.load).grid(row=0, column=9, padx=6, pady=4)
+        ttk.Button(bottom, text="Import...", command=self.import_statement).grid(row=0, column=10, padx=6, pady=4)
 
+        self.save_status_var = tk.StringVar(value="")
+        ttk.Label(bottom, textvariable=self.save_status_var, width=18).grid(row=0, column=11, padx=6, pady=4, sticky="w")
+
+        # --- Loading status: built the first time a CSV streams in ---
+        self.status_frame = None
+        self.load_progress = tk.DoubleVar(value=0.0)
 
         self.bind("<Return>", lambda e: self.add_expense())  # Enter adds expense
+        self.bind("<Control-z>", lambda e: self.undo())
+        self.bind("<Control-y>", lambda e: self.redo())
+        self.bind("<Control-Shift-Z>", lambda e: self.redo())
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        self.after(CHANGE_POLL_MS, self._poll_changes)
 
-        # Auto-load
-        if DATA_FILE.exists():
-            self.load()
+        # Auto-load, once the empty window has been drawn so startup doesn't wait on the data
+        if self.ledger.has_data():
+            self.update_idletasks()
+            self.after_idle(self.load)
         else:
             # default month list to current month even if no file yet
             self.rebuild_month_list()
             self.refresh_table()
 
     # ---------- Helpers ----------
-    def _parse_amount(self, text: str) -> float:
-        t = text.strip().replace("$", "")
-        if not t:
-            raise ValueError("Empty amount")
-        return float(t)
-
-    def month_key(self, date_str: str) -> str:
-        # expecting MM-DD-YYYY
-        return date_str[:7]  # MM-YYYY
-
-    def current_filter(self) -> str:
-        return self.month_var.get()
+    def current_filter(self):
+        """The selected month key, or "All"."""
+        return self.month_keys.get(self.month_var.get(), "All")
+
+    def visible_indices(self):
+        ids = self.ledger.ids(self.current_filter())
+        if self.search_query is None:
+            return ids
+        # re-run on every refresh so edits, deletes and undo show up; queries cost milliseconds
+        hits = self.ledger.search(self.search_query)
+        if self.current_filter() == "All":
+            return hits
+        in_month = set(ids)
+        return [i for i in hits if i in in_month]
 
     def filtered_transactions(self):
-        m = self.current_filter()
-        if m == "All":
-            return list(self.transactions)
-        return [tx for tx in self.transactions if self.month_key(tx["date"]) == m]
+        return self.ledger.query(self.current_filter())
 
+    @profiler.timed("rebuild_month_list")
     def rebuild_month_list(self):
-        months = sorted({self.month_key(tx["date"]) for tx in self.transactions}, reverse=True)
-        values = ["All"] + months
+        self.month_keys = {month_label(m): m for m in self.ledger.months()}
+        values = ["All"] + list(self.month_keys)
         self.month_menu["values"] = values
         # If current selection vanished, reset
         if self.month_var.get() not in values:
             self.month_var.set("All")
 
+    @profiler.timed("refresh_table")
     def refresh_table(self):
-        # clear table
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-
-        # insert filtered rows with stable IDs (index from master list)
-        current_month = self.month_var.get()
-
-        for tx_index, tx in enumerate(self.transactions):
-            if current_month != "All" and self.month_key(tx["date"]) != current_month:
-                continue
-
-            self.tree.insert(
-                "",
-                tk.END,
-                iid=str(tx_index),
-                values=(tx["date"], tx["type"], f'{tx["amount"]:.2f}', tx["category"], tx["note"]),
-            )
-
+        if self.load_state == "loading":
+            if self.ledger.rollup_months is not None and self.search_query is None:
+                self.update_totals()  # the rollup has every month's totals already
+            return  # the preview stays up until every row has arrived
+        self.view_rows = self.visible_indices()
+        self.virtual_mode = len(self.view_rows) > VIRTUAL_THRESHOLD
+        if not self.virtual_mode:
+            self.view_top = 0
+
+        self._render_window()
         self.update_totals()
 
+    # ---------- Virtual scrolling ----------
+    def _window_indices(self):
+        if not self.virtual_mode:
+            return self.view_rows
+        self.view_top = max(0, min(self.view_top, len(self.view_rows) - TABLE_HEIGHT))
+        return self.view_rows[self.view_top:self.view_top + TABLE_HEIGHT + VIRTUAL_BUFFER]
+
+    def _row_values(self, tx: dict) -> tuple:
+        return (tx["date"], tx["type"], f'{tx["amount"]:.2f}', tx["category"], tx["note"])
+
+    def _window_rows(self):
+        return self.ledger.rows(self._window_indices())
+
+    def _render_window(self):
+        # rows with stable IDs (index from master list), in ascending index order
+        desired = [(str(i), self._row_values(tx)) for i, tx in self._window_rows()]
+        wanted = dict(desired)
+
+        # Reconcile against what is already in the Treeview: only touch rows that changed
+        with profiler.measure("tk.insert_batch"):
+            stale = [iid for iid in self.rendered if iid not in wanted]
+            if stale:
+                self.tree.delete(*stale)
+                for iid in stale:
+                    del self.rendered[iid]
+
+            # Both the tree and desired are ordered by index, so pos is the right insert slot
+            for pos, (iid, values) in enumerate(desired):
+                old = self.rendered.get(iid)
+                if old is None:
+                    self.tree.insert("", pos, iid=iid, values=values)
+                elif old != values:
+                    self.tree.item(iid, values=values)
+                self.rendered[iid] = values
+
+        if self.virtual_mode:
+            self.tree.yview_moveto(0)
+            total = len(self.view_rows)
+            self.vscroll.set(self.view_top / total, min(1.0, (self.view_top + TABLE_HEIGHT) / total))
+
+    def _scroll_to(self, top: int):
+        top = max(0, min(top, len(self.view_rows) - TABLE_HEIGHT))
+        if top == self.view_top:
+            return
+        selected = self.tree.selection()
+        self.view_top = top
+        self._render_window()
+        # keep whatever part of the selection is still paged in
+        self.tree.selection_set([iid for iid in selected if self.tree.exists(iid)])
+
+    def _on_vscroll(self, *args):
+        if not self.virtual_mode:
+            self.tree.yview(*args)
+            return
+        if args[0] == "moveto":
+            self._scroll_to(int(float(args[1]) * len(self.view_rows)))
+        elif args[0] == "scroll":
+            step = TABLE_HEIGHT if args[2] == "pages" else 1
+            self._scroll_to(self.view_top + int(args[1]) * step)
+
+    def _on_tree_yview(self, first, last):
+        if not self.virtual_mode:
+            self.vscroll.set(first, last)
+            return
+        # Keyboard navigation can scroll the Treeview into the buffer rows; re-page around them
+        shown = len(self.tree.get_children())
+        offset = round(float(first) * shown) if shown else 0
+        if offset:
+            self.after_idle(self._scroll_to, self.view_top + offset)
+
+    def _on_mousewheel(self, event):
+        if not self.virtual_mode:
+            return None
+        if event.num == 4 or event.delta > 0:
+            self._scroll_to(self.view_top - 3)
+        else:
+            self._scroll_to(self.view_top + 3)
+        return "break"
+
+
+    # ---------- Search ----------
+    def _on_search_return(self, event):
+        self.run_search()
+        return "break"  # keep the window-wide Enter binding from adding an expense
+
+    @profiler.timed("search")
+    def run_search(self):
+        if not self._ready():
+            return
+        text = self.search_entry.get().strip()
+        if not text:
+            self.clear_search()
+            return
+        try:
+            self.search_query = parse_query(text)
+        except ValueError as e:
+            messagebox.showerror("Search", str(e))
+            return
+        self.view_top = 0
+        self.refresh_table()
+
+    def clear_search(self):
+        self.search_entry.delete(0, tk.END)
+        if self.search_query is not None:
+            self.search_query = None
+            self.view_top = 0
+            self.refresh_table()
 
     def show_all(self):
         self.month_var.set("All")
@@ -229,22 +407,23 @@ class BudgetApp(tk.Tk):
             self.month_var.set(months[i - 1])
             self.refresh_table()
 
-    def _parse_date(self, text: str) -> str:
-        t = text.strip()
-        # Validates format and real date
-        datetime.strptime(t, "%m-%d-%Y")
-        return t
-    
     def edit_selected(self):
+        if not self._ready():
+            return
         selected = self.tree.selection()
         if not selected:
             messagebox.showinfo("Edit", "Select a row to edit first.")
             return
 
         tx_index = int(selected[0])  # iid we set in refresh_table()
-        tx = self.transactions[tx_index]
+        generation = self.selection_generation  # the row ids are only good while this holds
+        if generation != self.ledger.generation:
+            self._clear_stale_selection()
+            messagebox.showinfo("Edit", "Rows were changed in another window. Select the row again.")
+            return
+        tx = self.ledger.get(tx_index)
 
-        win = tk.Toplevel(self)
+        win = self.edit_win = tk.Toplevel(self)
         win.title("Edit Transaction")
         win.resizable(False, False)
 
@@ -269,7 +448,7 @@ class BudgetApp(tk.Tk):
         cat_menu = ttk.Combobox(
              win,
             textvariable=cat_var,
-            values=["Groceries", "Dining", "Gas", "Bills", "Shopping", "Health", "Entertainment", "Other", "Income"],
+            values=CATEGORIES + ["Income"],
             state="readonly",
             width=18,
         )
@@ -282,27 +461,17 @@ class BudgetApp(tk.Tk):
 
         def save_changes():
             try:
-                new_date = self._parse_date(date_e.get())
-                new_type = type_var.get()
-                new_amount = self._parse_amount(amt_e.get())
-                if new_amount <= 0:
-                    raise ValueError("Amount must be > 0")
-                new_cat = cat_var.get()
-                if new_type == "Income":
-                    new_cat = "Income"  # keep consistent
-                new_note = note_e.get().strip()
-
-                self.transactions[tx_index] = {
-                    "date": new_date,
-                    "type": new_type,
-                    "amount": float(new_amount),
-                    "category": new_cat,
-                    "note": new_note,
-                }
+                self.ledger.edit(
+                    tx_index, make_tx(date_e.get(), type_var.get(), amt_e.get(), cat_var.get(), note_e.get()),
+                    generation,
+                )
 
                 self.rebuild_month_list()
                 self.refresh_table()
                 win.destroy()
+            except LedgerChanged as e:
+                win.destroy()
+                self._show_outside_change(e)
             except Exception:
                 messagebox.showerror("Invalid edit", "Check the date (YYYY-MM-DD) and amount.")
 
@@ -313,19 +482,10 @@ class BudgetApp(tk.Tk):
         
     # ---------- Actions ----------
     def add_income(self):
+        if not self._ready():
+            return
         try:
-            date_str = self._parse_date(self.date_entry.get())
-            amount = self._parse_amount(self.income_entry.get())
-            if amount <= 0:
-                raise ValueError("Income must be > 0")
-            tx = {
-            "date": date_str,
-            "type": "Income",
-            "amount": amount,
-            "category": "Income",
-            "note": "",
-            }
-            self.transactions.append(tx)
+            self.ledger.add(make_tx(self.date_entry.get(), "Income", self.income_entry.get()))
 
             self.income_entry.delete(0, tk.END)
             self.income_entry.focus_set()
@@ -336,19 +496,12 @@ class BudgetApp(tk.Tk):
             messagebox.showerror("Invalid entry", "Use date format YYYY-MM-DD and a valid income amount (example: 1500).")
 
     def add_expense(self):
+        if not self._ready():
+            return
         try:
-            date_str = self._parse_date(self.date_entry.get())
-            amount = self._parse_amount(self.expense_entry.get())
-            if amount <= 0:
-                raise ValueError("Expense must be > 0")
-            tx = {
-                "date": date_str,
-                "type": "Expense",
-                "amount": amount,
-                "category": self.category.get(),
-                "note": self.note_entry.get().strip(),
-            }
-            self.transactions.append(tx)
+            self.ledger.add(
+                make_tx(self.date_entry.get(), "Expense", self.expense_entry.get(), self.category.get(), self.note_entry.get())
+            )
 
             self.expense_entry.delete(0, tk.END)
             self.note_entry.delete(0, tk.END)
@@ -360,27 +513,143 @@ class BudgetApp(tk.Tk):
             messagebox.showerror("Invalid entry", "Use date format YYYY-MM-DD and a valid expense amount (example: 23.45).")
 
     def delete_selected(self):
+        if not self._ready():
+            return
         selected = self.tree.selection()
         if not selected:
             return
 
-        indices = sorted([int(i) for i in selected], reverse=True)
-        for idx in indices:
-            self.transactions.pop(idx)
+        try:
+            self.ledger.delete((int(i) for i in selected), self.selection_generation)
+        except LedgerChanged as e:
+            self._show_outside_change(e)
+            return
 
         self.rebuild_month_list()
         self.refresh_table()
 
-    def update_totals(self):
-        current_month = self.month_var.get()
+    def undo(self):
+        # the ledger replays only the rows the command touched; the table reconciles just those
+        self._replay_history(self.ledger.undo)
+
+    def redo(self):
+        self._replay_history(self.ledger.redo)
+
+    def _update_edit_menu(self):
+        self.edit_menu.entryconfigure("Undo", state="normal" if self.ledger.can_undo() else "disabled")
+        self.edit_menu.entryconfigure("Redo", state="normal" if self.ledger.can_redo() else "disabled")
 
-        visible = []
-        for tx in self.transactions:
-            if current_month == "All" or self.month_key(tx["date"]) == current_month:
-                visible.append(tx)
+    def _replay_history(self, step):
+        if not self._ready():
+            return
+        try:
+            changed = step()
+        except LedgerChanged as e:  # SQLite: another window reused the ids this would put back
+            self._show_outside_change(e)
+            return
+        if changed:
+            self.rebuild_month_list()
+            self.refresh_table()
+
+    def import_statement(self):
+        if not self._ready():
+            return
+        path = filedialog.askopenfilename(
+            parent=self, title="Import statement", filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+        try:
+            header = read_header(path)
+        except Exception as e:
+            messagebox.showerror("Import failed", str(e))
+            return
+        if not header:
+            messagebox.showerror("Import failed", "That file has no header row.")
+            return
+
+        win = tk.Toplevel(self)
+        win.title("Map Statement Columns")
+        win.resizable(False, False)
 
-        income = sum(tx["amount"] for tx in visible if tx["type"] == "Income")
-        expenses = sum(tx["amount"] for tx in visible if tx["type"] == "Expense")
+        def guess(*words):
+            for col in header:
+                if any(w in col.lower() for w in words):
+                    return col
+            return ""
+
+        # (label, default guess, required)
+        fields = [
+            ("Date", guess("date"), True),
+            ("Amount", guess("amount", "value"), True),
+            ("Type", guess("type"), False),
+            ("Category", guess("category"), False),
+            ("Note", guess("description", "memo", "note", "payee"), False),
+        ]
+        choice_vars = {}
+        for row, (label, default, required) in enumerate(fields):
+            ttk.Label(win, text=f"{label} column:").grid(row=row, column=0, padx=8, pady=6, sticky="e")
+            var = tk.StringVar(value=default)
+            values = header if required else [""] + header
+            ttk.Combobox(win, textvariable=var, values=values, state="readonly", width=24).grid(
+                row=row, column=1, padx=8, pady=6, sticky="w"
+            )
+            choice_vars[label] = var
+
+        ttk.Label(win, text="Date format:").grid(row=5, column=0, padx=8, pady=6, sticky="e")
+        fmt_e = ttk.Entry(win, width=14)
+        fmt_e.grid(row=5, column=1, padx=8, pady=6, sticky="w")
+        fmt_e.insert(0, "%m-%d-%Y")
+
+        def run_import():
+            mapping = StatementMapping(
+                date=choice_vars["Date"].get(),
+                amount=choice_vars["Amount"].get(),
+                type=choice_vars["Type"].get() or None,
+                category=choice_vars["Category"].get() or None,
+                note=choice_vars["Note"].get() or None,
+                date_format=fmt_e.get().strip() or "%m-%d-%Y",
+            )
+            if not mapping.date or not mapping.amount:
+                messagebox.showerror("Import", "Pick the date and amount columns.", parent=win)
+                return
+            try:
+                rows, errors = read_statement(path, mapping)
+            except Exception as e:
+                messagebox.showerror("Import failed", str(e), parent=win)
+                return
+
+            if errors:
+                line_no, msg = errors[0]
+                ok = messagebox.askyesno(
+                    "Import",
+                    f"{len(errors)} row(s) were skipped (first: line {line_no}, {msg}).\n"
+                    f"Import the other {len(rows)} row(s)?",
+                    parent=win,
+                )
+                if not ok:
+                    return
+            win.destroy()
+            if not rows:
+                return
+
+            # one storage write and one redraw for the whole file
+            self.ledger.add_many(rows)
+            self.rebuild_month_list()
+            self.refresh_table()
+            messagebox.showinfo("Import", f"Imported {len(rows)} transaction(s).")
+
+        btns = ttk.Frame(win)
+        btns.grid(row=6, column=0, columnspan=2, pady=10)
+        ttk.Button(btns, text="Import", command=run_import).grid(row=0, column=0, padx=6)
+        ttk.Button(btns, text="Cancel", command=win.destroy).grid(row=0, column=1, padx=6)
+
+    @profiler.timed("update_totals")
+    def update_totals(self):
+        if self.search_query is None:
+            income, expenses = self.ledger.totals(self.current_filter())
+        else:
+            income, expenses = self.ledger.totals_of(self.view_rows)
         balance = income - expenses
 
         self.income_total_var.set(f"{income:.2f}")
@@ -388,52 +657,276 @@ class BudgetApp(tk.Tk):
         self.balance_var.set(f"{balance:.2f}")
 
 
-    def save(self):
-        try:
-            with open(DATA_FILE, "w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=["date", "type", "amount", "category", "note"])
-                writer.writeheader()
-                for tx in self.transactions:
-                    writer.writerow(tx)
-            messagebox.showinfo("Saved", f"Saved to:\n{DATA_FILE}")
-        except Exception as e:
-            messagebox.showerror("Save failed", str(e))
+    # ---------- Timing stats ----------
+    def toggle_profiling(self):
+        if self.profile_var.get():
+            profiler.enable()
+        else:
+            profiler.disable()
 
+    def show_stats(self):
+        if self.stats_win is not None and self.stats_win.winfo_exists():
+            self.stats_win.lift()
+            return
+        self.stats_win = tk.Toplevel(self)
+        self.stats_win.title("Timing Stats")
+
+        cols = ("name", "calls", "total", "mean", "max")
+        tree = ttk.Treeview(self.stats_win, columns=cols, show="headings", height=10)
+        tree.grid(row=0, column=0, columnspan=2, padx=8, pady=8)
+        for col, text, width in zip(cols, ("Name", "Calls", "Total ms", "Mean ms", "Max ms"), (160, 60, 90, 90, 90)):
+            tree.heading(col, text=text)
+            tree.column(col, width=width, anchor="w" if col == "name" else "e")
+
+        ttk.Button(self.stats_win, text="Reset", command=profiler.reset).grid(row=1, column=0, pady=(0, 8))
+        ttk.Button(self.stats_win, text="Close", command=self.stats_win.destroy).grid(row=1, column=1, pady=(0, 8))
+        self._refresh_stats(tree)
+
+    def _refresh_stats(self, tree):
+        if self.stats_win is None or not self.stats_win.winfo_exists():
+            return
+        tree.delete(*tree.get_children())
+        if not profiler.enabled and not profiler.stats:
+            tree.insert("", tk.END, values=("(Tools > Record Timings is off)", "", "", "", ""))
+        for name, calls, total, mean, worst in profiler.rows():
+            tree.insert("", tk.END, values=(name, calls, f"{total:.1f}", f"{mean:.2f}", f"{worst:.2f}"))
+        self.after(STATS_POLL_MS, self._refresh_stats, tree)
+
+    # ---------- Storage ----------
+    def on_close(self):
+        if self.loader is not None:
+            self.loader.cancel()
+        if self.autosave_job is not None:
+            self.after_cancel(self.autosave_job)
+            self.autosave_job = None
+        # flush: write out whatever autosave has not got to yet (never a half-loaded ledger)
+        if self.load_state == "ready" and self.ledger.is_dirty():
+            try:
+                self.ledger.save()
+            except Exception as e:
+                messagebox.showerror("Save failed", f"{e}\n\nYour changes are kept in the journal and come back on the next load.")
+        self.ledger.close()
+        profiler.disable()  # writes the session's .pstats file when cProfile was on
+        self.destroy()
+
+    @profiler.timed("save")
+    def save(self):
+        # Changes are already durable in the journal; Save starts the snapshot write autosave would do
+        if not self._ready():
+            return
+        if self.autosave_job is not None:
+            self.after_cancel(self.autosave_job)
+        self._autosave()
+
+    # ---------- Other windows ----------
+    def _poll_changes(self):
+        # journal records from other processes are applied incrementally, not by re-reading the file
+        if self.load_state == "ready":
+            generation = self.ledger.generation
+            try:
+                if self.ledger.poll_changes():
+                    self.rebuild_month_list()
+                    self.refresh_table()
+                if self.ledger.generation != generation:
+                    self._clear_stale_selection()  # the selected iids now name other rows
+            except OSError:
+                pass  # e.g. the data folder is briefly unavailable; try again next time
+        self.after(CHANGE_POLL_MS, self._poll_changes)
+
+    def _on_select(self, event=None):
+        self.selection_generation = self.ledger.generation
+
+    def _clear_stale_selection(self):
+        self.tree.selection_set(())
+        self.selection_generation = self.ledger.generation
+        if self.edit_win is not None and self.edit_win.winfo_exists():
+            self.edit_win.destroy()
+            messagebox.showinfo("Ledger changed", "Rows were deleted or restored in another window. Select the row again to edit it.")
+        self.edit_win = None
+
+    def _show_outside_change(self, error: LedgerChanged):
+        self.rebuild_month_list()
+        self.refresh_table()
+        self._clear_stale_selection()
+        messagebox.showinfo("Ledger changed", str(error))
+
+    # ---------- Autosave ----------
+    def _schedule_autosave(self):
+        # every change restarts the countdown, so a burst of edits ends in a single write
+        if self.autosave_job is not None:
+            self.after_cancel(self.autosave_job)
+        self.autosave_job = self.after(AUTOSAVE_MS, self._autosave)
+        self.save_status_var.set("Unsaved changes")
+
+    def _autosave(self):
+        self.autosave_job = None
+        if self.load_state == "loading" or self.ledger.saving():
+            self.autosave_job = self.after(AUTOSAVE_MS, self._autosave)
+            return
+        if self.ledger.autosave():  # temp file + rename on the journal's worker thread
+            self.save_status_var.set("Saving...")
+            self.after(SAVE_POLL_MS, self._poll_autosave)
+
+    def _poll_autosave(self):
+        if self.ledger.saving():
+            self.after(SAVE_POLL_MS, self._poll_autosave)
+        elif self.ledger.save_error() is not None:
+            self.save_status_var.set("Autosave failed")  # the journal still has every change
+        elif self.autosave_job is None:
+            self.save_status_var.set(f"Saved {datetime.now():%H:%M:%S}")
+
+    @profiler.timed("load")
     def load(self):
+        if self.load_state == "loading":
+            return
         try:
-            self.transactions.clear()
-
-            if not DATA_FILE.exists():
+            self.load_state = "ready"
+            data_file = self.ledger.data_file
+            if self.ledger.db is None and data_file.suffix != BINARY_SUFFIX and data_file.exists():
+                # parse on a worker thread; _poll_loader folds batches in as they arrive
+                self.ledger.reset()
+                self.load_state = "loading"
+                self.loader = CsvStreamLoader(data_file)
+                self.loader.start()
+                self.load_progress.set(0.0)
+                self._show_status()
+                if self.ledger.preload_rollup():
+                    self._show_latest_month()  # months and totals are ready before any row is
+                self.after(LOADER_POLL_MS, self._poll_loader)
+                return
+            if not self.ledger.has_data():
                 messagebox.showinfo("No data", "No saved data found yet.")
                 self.rebuild_month_list()
                 self.refresh_table()
                 return
 
-            with open(DATA_FILE, "r", newline="", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for r in reader:
-                    tx = {
-                        "date": r["date"],
-                        "type": r["type"],
-                        "amount": float(r["amount"]),
-                        "category": r["category"],
-                        "note": r["note"],
-                    }
-                    self.transactions.append(tx)
+            if self.ledger.db is None and data_file.suffix == BINARY_SUFFIX and data_file.exists():
+                # the newest month comes straight out of the mmap, so it shows before the full copy below
+                self._show_preview(read_latest_month(data_file))
+                self.update_idletasks()
 
-            self.rebuild_month_list()
-            # default to latest month (optional). Comment out if you prefer "All".
-            months = [m for m in self.month_menu["values"] if m != "All"]
-            if months:
-                self.month_var.set(months[0])  # latest month
-            else:
-                self.month_var.set("All")
+            # SQLite and binary snapshots need no parsing, so they load in place
+            self.ledger.load()
+            self._show_latest_month()
+            if self.ledger.is_dirty():
+                self._schedule_autosave()  # fold in a journal left by the last session
+        except Exception as e:
+            messagebox.showerror("Load failed", str(e))
 
-            self.refresh_table()
+    def _show_status(self):
+        if self.status_frame is None:
+            self.status_frame = ttk.Frame(self, padding=(12, 0, 12, 12))
+            ttk.Label(self.status_frame, text="Loading...").grid(row=0, column=0, padx=6, sticky="w")
+            ttk.Progressbar(self.status_frame, variable=self.load_progress, maximum=100, length=400).grid(
+                row=0, column=1, padx=6
+            )
+            ttk.Button(self.status_frame, text="Cancel", command=self.cancel_load).grid(row=0, column=2, padx=6)
+        self.status_frame.grid(row=4, column=0, sticky="ew")
+
+    def _hide_status(self):
+        if self.status_frame is not None:
+            self.status_frame.grid_remove()
+
+    @profiler.timed("load.finish")
+    def _finish_load(self):
+        # snapshot + journal tail
+        self.ledger.finish_load()
+        self._show_latest_month()
+        if self.ledger.is_dirty():
+            self._schedule_autosave()  # fold in a journal left by the last session
+
+    @profiler.timed("load.poll")
+    def _poll_loader(self):
+        if self.load_state != "loading":
+            return
+        try:
+            for event in self.loader.drain():
+                if event[0] == "preview":
+                    self._show_preview(event[1])
+                elif event[0] == "rows":
+                    self.ledger.transactions.extend(event[1])
+                    self.load_progress.set(event[2] * 100)
+                elif event[0] == "done":
+                    self.load_state = "ready"
+                    self._hide_status()
+                    self._finish_load()
+                    return
+                elif event[0] == "error":
+                    raise event[1]
         except Exception as e:
+            # keep the app read-only so a half-loaded ledger can't overwrite the file
+            self.load_state = "cancelled"
+            self._hide_status()
             messagebox.showerror("Load failed", str(e))
+            return
+        self.after(LOADER_POLL_MS, self._poll_loader)
+
+    def _show_preview(self, rows):
+        """Show the newest month found at the end of the file while the rest is still parsing."""
+        if not rows:
+            return
+        month = max(month_key(tx["date"]) for tx in rows)
+        rows = [tx for tx in rows if month_key(tx["date"]) == month]
+        preloaded = self.ledger.rollup_months is not None
+        if preloaded and month != self.current_filter():
+            return  # the rollup already filled in the months; these rows belong to another one
+        if not preloaded:
+            self.month_keys = {month_label(month): month}
+            self.month_menu["values"] = ["All", month_label(month)]
+            self.month_var.set(month_label(month))
+
+        # provisional iids; refresh_table swaps in the real index-based rows once loading finishes
+        self.tree.delete(*self.rendered)
+        self.rendered = {}
+        with profiler.measure("tk.insert_batch"):
+            for n, tx in enumerate(rows[:VIRTUAL_THRESHOLD]):
+                iid = f"preview{n}"
+                self.rendered[iid] = self._row_values(tx)
+                self.tree.insert("", tk.END, iid=iid, values=self.rendered[iid])
+
+        if preloaded:
+            return  # totals come from the rollup, and are for the whole month
+        income = sum(tx["amount"] for tx in rows if tx["type"] == "Income")
+        expenses = sum(tx["amount"] for tx in rows if tx["type"] == "Expense")
+        self.income_total_var.set(f"{income:.2f}")
+        self.expense_total_var.set(f"{expenses:.2f}")
+        self.balance_var.set(f"{income - expenses:.2f}")
+
+    def cancel_load(self):
+        if self.load_state != "loading":
+            return
+        self.loader.cancel()
+        self.load_state = "cancelled"
+        self._hide_status()
+        self.ledger.reset()
+        self.rebuild_month_list()
+        self.refresh_table()
+
+    def _ready(self) -> bool:
+        # Writes are blocked until the whole file is in memory, or the journal would replay onto half a ledger
+        if self.load_state == "loading":
+            messagebox.showinfo("Loading", "Still loading your data, try again in a moment.")
+            return False
+        if self.load_state == "cancelled":
+            messagebox.showinfo("Not loaded", "Loading was cancelled. Press Load before making changes.")
+            return False
+        return True
+
+    def _show_latest_month(self):
+        self.rebuild_month_list()
+        # default to latest month (optional). Comment out if you prefer "All".
+        months = [m for m in self.month_menu["values"] if m != "All"]
+        if months:
+            self.month_var.set(months[0])  # latest month
+        else:
+            self.month_var.set("All")
+
+        self.refresh_table()
 
 
 if __name__ == "__main__":
-    app = BudgetApp()
+    args = sys.argv[1:]
+    if "--data" in args:
+        DATA_FILE = Path(args[args.index("--data") + 1]).expanduser()
+    app = BudgetApp(use_sqlite="--sqlite" in args)
     app.mainloop()
@@ -0,0 +1,265 @@
+"""Binary snapshot format for budget ledgers (*.budget).
+
+Layout, all little-endian:
+    magic      8 bytes  b"BUDGETB1"
+    rows       u64
+    toc        len(SECTIONS) x (offset u64, size u64)
+    sections   in SECTIONS order
+
+String tables (dates, types, categories, notes) are u32 count, u32 offsets[count + 1]
+and a UTF-8 blob. The five columns hold one fixed-width value per row: amount is f64,
+the rest are u32 ids into the matching string table. "months" is a JSON directory
+{month: [start, count]} into "month_rows", a u32 list of row numbers grouped by month,
+so one month can be read straight out of the mmap without touching the other rows.
+Month keys are integers (year * 12 + month - 1), written as JSON object keys.
+"""
+import csv
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+from budget_store import CodeTable, TransactionStore, read_csv
+
+MAGIC = b"BUDGETB1"
+SUFFIX = ".budget"
+SECTIONS = [
+    "dates", "types", "categories", "notes",
+    "amount", "date", "type", "category", "note",
+    "months", "month_rows",
+]
+_HEADER = struct.Struct("<8sQ")
+_TOC_ENTRY = struct.Struct("<QQ")
+_AMOUNT = struct.Struct("<d")
+_ID = struct.Struct("<I")
+
+
+def _u32(values) -> bytes:
+    a = array("I", values)
+    if sys.byteorder != "little":
+        a.byteswap()
+    return a.tobytes()
+
+
+def _f64(values) -> bytes:
+    a = array("d", values)
+    if sys.byteorder != "little":
+        a.byteswap()
+    return a.tobytes()
+
+
+def _string_table(strings) -> bytes:
+    blobs = [s.encode("utf-8") for s in strings]
+    offsets = [0]
+    for b in blobs:
+        offsets.append(offsets[-1] + len(b))
+    return _u32([len(blobs)]) + _u32(offsets) + b"".join(blobs)
+
+
+def _read_u32(buf, offset: int, count: int) -> array:
+    a = array("I")
+    a.frombytes(buf[offset:offset + 4 * count])
+    if sys.byteorder != "little":
+        a.byteswap()
+    return a
+
+
+def _read_string_table(buf, offset: int) -> list:
+    (count,) = _ID.unpack_from(buf, offset)
+    offsets = _read_u32(buf, offset + 4, count + 1)
+    base = offset + 4 + 4 * (count + 1)
+    blob = bytes(buf[base:base + offsets[-1]]).decode("utf-8")
+    if len(blob) == offsets[-1]:  # all ASCII: byte offsets are character offsets
+        return [sys.intern(blob[offsets[i]:offsets[i + 1]]) for i in range(count)]
+    raw = buf[base:base + offsets[-1]]
+    return [sys.intern(bytes(raw[offsets[i]:offsets[i + 1]]).decode("utf-8")) for i in range(count)]
+
+
+def _as_store(transactions) -> TransactionStore:
+    if isinstance(transactions, TransactionStore):
+        return transactions
+    store = TransactionStore()
+    store.extend(transactions)
+    return store
+
+
+def encode(transactions, month_key=None) -> bytes:
+    """Serialize a TransactionStore (or any iterable of row dicts) to the binary format."""
+    store = _as_store(transactions)
+    notes = CodeTable()
+    note_ids = [notes.code(n) for n in store.notes]
+
+    directory = {}
+    month_rows = []
+    if month_key is not None:
+        month_of_date = [month_key(d) for d in store.dates.values]
+        groups = {}
+        for row, d in enumerate(store.date_codes):
+            groups.setdefault(month_of_date[d], []).append(row)
+        for month, rows in groups.items():
+            directory[month] = [len(month_rows), len(rows)]
+            month_rows.extend(rows)
+
+    sections = [
+        _string_table(store.dates.values),
+        _string_table(store.types.values),
+        _string_table(store.categories.values),
+        _string_table(notes.values),
+        _f64(store.amounts),
+        _u32(store.date_codes),
+        _u32(store.type_codes),
+        _u32(store.category_codes),
+        _u32(note_ids),
+        json.dumps(directory).encode("utf-8"),
+        _u32(month_rows),
+    ]
+
+    offset = _HEADER.size + _TOC_ENTRY.size * len(SECTIONS)
+    toc = []
+    for data in sections:
+        toc.append(_TOC_ENTRY.pack(offset, len(data)))
+        offset += len(data)
+    return _HEADER.pack(MAGIC, len(store)) + b"".join(toc) + b"".join(sections)
+
+
+def write_binary(path: Path, transactions, month_key=None):
+    with open(path, "wb") as f:
+        f.write(encode(transactions, month_key))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class BinaryLedger:
+    """Read-only, memory-mapped view of a *.budget file."""
+
+    def __init__(self, path: Path):
+        self._file = open(path, "rb")
+        if os.fstat(self._file.fileno()).st_size < _HEADER.size:
+            self._file.close()
+            raise ValueError(f"{path} is not a budget snapshot")
+        self.buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.rows = _HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a budget snapshot")
+        self.toc = {}
+        for n, name in enumerate(SECTIONS):
+            self.toc[name] = _TOC_ENTRY.unpack_from(self.buf, _HEADER.size + n * _TOC_ENTRY.size)
+
+        # string tables are small (one entry per distinct value), so decode them up front
+        self.dates = _read_string_table(self.buf, self.toc["dates"][0])
+        self.types = _read_string_table(self.buf, self.toc["types"][0])
+        self.categories = _read_string_table(self.buf, self.toc["categories"][0])
+        self.notes = _read_string_table(self.buf, self.toc["notes"][0])
+
+    def __len__(self):
+        return self.rows
+
+    def _id(self, column: str, row: int) -> int:
+        return _ID.unpack_from(self.buf, self.toc[column][0] + 4 * row)[0]
+
+    def row(self, i: int) -> dict:
+        return {
+            "date": self.dates[self._id("date", i)],
+            "type": self.types[self._id("type", i)],
+            "amount": _AMOUNT.unpack_from(self.buf, self.toc["amount"][0] + 8 * i)[0],
+            "category": self.categories[self._id("category", i)],
+            "note": self.notes[self._id("note", i)],
+        }
+
+    def __iter__(self):
+        for i in range(self.rows):
+            yield self.row(i)
+
+    def months(self) -> dict:
+        offset, size = self.toc["months"]
+        directory = json.loads(bytes(self.buf[offset:offset + size]).decode("utf-8"))
+        return {int(month): span for month, span in directory.items()}
+
+    def month_rows(self, month: int) -> list:
+        """Row numbers of one month, read from the directory without scanning the columns."""
+        start, count = self.months().get(month, (0, 0))
+        return list(_read_u32(self.buf, self.toc["month_rows"][0] + 4 * start, count))
+
+    def read_month(self, month: int) -> list:
+        return [(i, self.row(i)) for i in self.month_rows(month)]
+
+    def load_into(self, store: TransactionStore):
+        """Bulk-append every row to store, column by column."""
+        n = self.rows
+        amounts = array("d")
+        amounts.frombytes(self.buf[self.toc["amount"][0]:self.toc["amount"][0] + 8 * n])
+        if sys.byteorder != "little":
+            amounts.byteswap()
+        date_ids = _read_u32(self.buf, self.toc["date"][0], n)
+        type_ids = _read_u32(self.buf, self.toc["type"][0], n)
+        category_ids = _read_u32(self.buf, self.toc["category"][0], n)
+        note_ids = _read_u32(self.buf, self.toc["note"][0], n)
+
+        # translate file ids to the store's own codes once per distinct value
+        date_map = [store.date_code(d) for d in self.dates]
+        type_map = [store.types.code(t) for t in self.types]
+        category_map = [store.categories.code(c) for c in self.categories]
+        store.amounts.extend(amounts)
+        store.date_codes.extend(array(store.date_codes.typecode, map(date_map.__getitem__, date_ids)))
+        store.type_codes.extend(array(store.type_codes.typecode, map(type_map.__getitem__, type_ids)))
+        store.category_codes.extend(array(store.category_codes.typecode, map(category_map.__getitem__, category_ids)))
+        store.notes.extend(map(self.notes.__getitem__, note_ids))
+
+    def close(self):
+        self.buf.close()
+        self._file.close()
+
+
+def read_binary(path: Path, store: TransactionStore = None) -> TransactionStore:
+    store = store if store is not None else TransactionStore()
+    ledger = BinaryLedger(path)
+    try:
+        ledger.load_into(store)
+    finally:
+        ledger.close()
+    return store
+
+
+def read_latest_month(path: Path) -> list:
+    """Transactions of the newest month, read through the month directory without loading the rest."""
+    ledger = BinaryLedger(path)
+    try:
+        months = ledger.months()
+        return [tx for _, tx in ledger.read_month(max(months))] if months else []
+    finally:
+        ledger.close()
+
+
+# ---------- CSV interchange ----------
+def csv_to_binary(csv_file: Path, out: Path, month_key=None):
+    store = TransactionStore()
+    read_csv(csv_file, store)
+    write_binary(out, store, month_key)
+
+
+def binary_to_csv(binary_file: Path, out: Path):
+    ledger = BinaryLedger(binary_file)
+    try:
+        with open(out, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=["date", "type", "amount", "category", "note"])
+            writer.writeheader()
+            for tx in ledger:
+                writer.writerow(tx)
+    finally:
+        ledger.close()
+
+
+if __name__ == "__main__":
+    # python budget_binary.py import data.csv data.budget | export data.budget data.csv
+    if len(sys.argv) != 4 or sys.argv[1] not in ("import", "export"):
+        sys.exit(__doc__.split("\n")[0] + "\nusage: budget_binary.py import|export SRC DEST")
+    if sys.argv[1] == "import":
+        from budget_ledger import month_key  # budget_ledger imports this module, so not at the top
+
+        csv_to_binary(Path(sys.argv[2]), Path(sys.argv[3]), month_key)
+    else:
+        binary_to_csv(Path(sys.argv[2]), Path(sys.argv[3]))
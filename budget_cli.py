@@ -0,0 +1,192 @@
+"""Command-line access to the budget ledger, for scripts and cron jobs.
+
+Works on the same budget_data.csv (and journal) as budget_app_monthly_v4.
+
+    python budget_cli.py add 03-14-2024 Expense 12.50 --category Dining --note lunch
+    python budget_cli.py import statement.csv        (or - for stdin)
+    python budget_cli.py month [MM-YYYY] [--format json|csv]
+    python budget_cli.py categories [--month MONTH] [--format json|csv]
+    python budget_cli.py export [--month MONTH] [--format csv|json]
+
+Import reads date,type,amount[,category][,note] CSV with a header row. Any bad row
+fails the whole batch unless --skip-bad is given (bad rows are then listed on stderr).
+"""
+import argparse
+import csv
+import json
+import sys
+from pathlib import Path
+
+from budget_import import check_row
+from budget_journal import FIELDS
+from budget_ledger import DATA_FILE, DB_FILE, BudgetLedger, make_tx, month_label, parse_month
+
+
+class BadRow(ValueError):
+    pass
+
+
+def _open_input(name: str):
+    if name == "-":
+        return sys.stdin
+    return open(name, "r", newline="", encoding="utf-8-sig")
+
+
+def statement_rows(f, skip_bad: bool, errors: list):
+    """Yield validated (date, type, amount, category, note) tuples from a ledger-format CSV."""
+    reader = csv.reader(f)
+    header = [h.strip().lower() for h in next(reader, [])]
+    missing = [c for c in ("date", "type", "amount") if c not in header]
+    if missing:
+        raise BadRow(f"missing column(s): {', '.join(missing)}")
+    di, ti, ai = header.index("date"), header.index("type"), header.index("amount")
+    ci = header.index("category") if "category" in header else None
+    ni = header.index("note") if "note" in header else None
+
+    dates = {}  # shared by every row, so each distinct date is parsed once
+    for line_no, values in enumerate(reader, start=2):
+        try:
+            row = check_row(
+                dates,
+                values[di],
+                values[ai],
+                values[ti],
+                values[ci] if ci is not None else "",
+                values[ni] if ni is not None else "",
+            )
+        except (ValueError, IndexError) as e:
+            if not skip_bad:
+                raise BadRow(f"line {line_no}: {e}")
+            errors.append((line_no, str(e)))
+            continue
+        yield row
+
+
+# ---------- Output ----------
+def _emit(fmt: str, header: list, rows: list, as_json):
+    if fmt == "json":
+        json.dump(as_json, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        writer = csv.writer(sys.stdout, lineterminator="\n")
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def _month_or_latest(ledger: BudgetLedger, month):
+    if month is not None:
+        return month
+    months = ledger.months()
+    return months[0] if months else "All"
+
+
+def _label(month) -> str:
+    return month if month == "All" else month_label(month)
+
+
+# ---------- Commands ----------
+def cmd_add(ledger: BudgetLedger, args):
+    tx = make_tx(args.date, args.type.title(), args.amount, args.category, args.note)
+    ledger.add(tx)  # journaled like an edit in the app; the next save folds it in
+    _emit(args.format, FIELDS, [[tx[f] for f in FIELDS]], tx)
+
+
+def cmd_import(ledger: BudgetLedger, args):
+    errors = []
+    f = _open_input(args.file)
+    try:
+        added = ledger.import_rows(statement_rows(f, args.skip_bad, errors))
+    finally:
+        if f is not sys.stdin:
+            f.close()
+    for line_no, msg in errors:
+        print(f"skipped line {line_no}: {msg}", file=sys.stderr)
+    _emit(args.format, ["imported", "skipped"], [[added, len(errors)]], {"imported": added, "skipped": len(errors)})
+
+
+def cmd_month(ledger: BudgetLedger, args):
+    month = _month_or_latest(ledger, args.month)
+    income, expenses = ledger.totals(month)
+    categories = {c: amount for (t, c), amount in sorted(ledger.category_totals_for(month).items()) if t == "Expense"}
+    label = _label(month)
+    summary = {"month": label, "income": income, "expenses": expenses, "balance": income - expenses, "categories": categories}
+    _emit(args.format, ["month", "income", "expenses", "balance"],
+          [[label, f"{income:.2f}", f"{expenses:.2f}", f"{income - expenses:.2f}"]], summary)
+
+
+def cmd_categories(ledger: BudgetLedger, args):
+    month = "All" if args.month is None else args.month
+    totals = sorted(ledger.category_totals_for(month).items())
+    label = _label(month)
+    _emit(args.format, ["month", "type", "category", "amount"],
+          [[label, t, c, f"{amount:.2f}"] for (t, c), amount in totals],
+          [{"month": label, "type": t, "category": c, "amount": amount} for (t, c), amount in totals])
+
+
+def cmd_export(ledger: BudgetLedger, args):
+    rows = ledger.rows(ledger.ids("All" if args.month is None else args.month))
+    if args.format == "json":
+        # one object per line, written as it goes
+        for _, tx in rows:
+            sys.stdout.write(json.dumps(tx) + "\n")
+        return
+    writer = csv.DictWriter(sys.stdout, fieldnames=FIELDS, lineterminator="\n")
+    writer.writeheader()
+    for _, tx in rows:
+        writer.writerow(tx)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Budget ledger batch interface.")
+    parser.add_argument("--data", type=Path, default=DATA_FILE, help=f"ledger file (default {DATA_FILE})")
+    parser.add_argument("--sqlite", action="store_true", help=f"use the SQLite ledger next to --data (default {DB_FILE})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("add", help="add one transaction")
+    p.add_argument("date", help="MM-DD-YYYY")
+    p.add_argument("type", help="Income or Expense")
+    p.add_argument("amount")
+    p.add_argument("--category", default="Other")
+    p.add_argument("--note", default="")
+    p.add_argument("--format", choices=["json", "csv"], default="json")
+    p.set_defaults(func=cmd_add)
+
+    p = sub.add_parser("import", help="bulk-add transactions from a CSV file or stdin")
+    p.add_argument("file", nargs="?", default="-", help="CSV file, or - for stdin (default)")
+    p.add_argument("--skip-bad", action="store_true", help="import the good rows even if some are bad")
+    p.add_argument("--format", choices=["json", "csv"], default="json")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser("month", help="income, expenses and categories for one month (default: latest)")
+    p.add_argument("month", nargs="?", type=parse_month, help="MM-YYYY")
+    p.add_argument("--format", choices=["json", "csv"], default="json")
+    p.set_defaults(func=cmd_month)
+
+    p = sub.add_parser("categories", help="totals per category")
+    p.add_argument("--month", type=parse_month, help="one month (MM-YYYY) instead of everything")
+    p.add_argument("--format", choices=["json", "csv"], default="json")
+    p.set_defaults(func=cmd_categories)
+
+    p = sub.add_parser("export", help="write transactions out")
+    p.add_argument("--month", type=parse_month, help="one month (MM-YYYY) instead of everything")
+    p.add_argument("--format", choices=["csv", "json"], default="csv", help="json writes one object per line")
+    p.set_defaults(func=cmd_export)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    ledger = BudgetLedger(args.data, args.data.with_suffix(".db") if args.sqlite else None)
+    try:
+        ledger.load()
+        args.func(ledger, args)
+    except (BadRow, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        ledger.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+import csv
+from datetime import datetime
+from pathlib import Path
+
+DATE_FORMAT = "%m-%d-%Y"  # what the app's date entry accepts and stores
+
+
+def parse_amount(text: str) -> float:
+    t = text.strip().replace("$", "")
+    if not t:
+        raise ValueError("Empty amount")
+    return float(t)
+
+
+def parse_date(text: str) -> str:
+    t = text.strip()
+    # Validates format and real date
+    datetime.strptime(t, DATE_FORMAT)
+    return t
+
+
+class StatementMapping:
+    """Which statement columns feed which ledger fields.
+
+    date and amount are required. Without a type column, negative amounts become
+    expenses and positive ones income (the usual bank export convention). Dates in
+    another layout can be read with date_format; they are stored as MM-DD-YYYY.
+    """
+
+    def __init__(self, date, amount, type=None, category=None, note=None,
+                 date_format=DATE_FORMAT, default_category="Other"):
+        self.date = date
+        self.amount = amount
+        self.type = type
+        self.category = category
+        self.note = note
+        self.date_format = date_format
+        self.default_category = default_category
+
+
+def check_row(dates: dict, raw_date: str, raw_amount: str, raw_type=None, category="", note="",
+              date_format=DATE_FORMAT, default_category="Other") -> tuple:
+    """Validate one statement row; return (date, type, amount, category, note) or raise ValueError.
+
+    Without raw_type the sign of the amount picks the type; either way the stored amount
+    is positive. dates caches each distinct date text (or its error) across rows.
+    """
+    raw_date = raw_date.strip()
+    date_str = dates.get(raw_date)
+    if date_str is None:
+        try:
+            parsed = datetime.strptime(raw_date, date_format)
+            date_str = parse_date(parsed.strftime(DATE_FORMAT))
+        except ValueError:
+            date_str = ValueError(f"bad date {raw_date!r}")
+        dates[raw_date] = date_str
+    if isinstance(date_str, ValueError):
+        raise ValueError(str(date_str))
+
+    try:
+        # statements often group thousands ("1,234.56"); otherwise the app's amount rules apply
+        amount = parse_amount(raw_amount.replace(",", ""))
+    except ValueError:
+        raise ValueError(f"bad amount {raw_amount!r}") from None
+
+    if raw_type is not None:
+        tx_type = raw_type.strip().title()
+        if tx_type not in ("Income", "Expense"):
+            raise ValueError(f"unknown type {raw_type!r}")
+    else:
+        tx_type = "Expense" if amount < 0 else "Income"
+    amount = abs(amount)
+    if not amount > 0:
+        raise ValueError("amount must be > 0")
+
+    if tx_type == "Income":
+        category = "Income"  # same rule as the edit dialog
+    else:
+        category = category.strip() or default_category
+    return date_str, tx_type, amount, category, note.strip()
+
+
+def read_header(path: Path) -> list:
+    with open(path, "r", newline="", encoding="utf-8-sig") as f:
+        return next(csv.reader(f), [])
+
+
+def read_statement(path: Path, mapping: StatementMapping):
+    """Parse and validate a whole statement.
+
+    Returns (rows, errors): rows are ledger dicts ready to add, errors are
+    (line number, message) for every row that was skipped.
+    """
+    rows = []
+    errors = []
+    dates = {}  # statement date text -> stored date (or the error), parsed once per distinct value
+
+    with open(path, "r", newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        missing = [c for c in (mapping.date, mapping.amount, mapping.type, mapping.category, mapping.note)
+                   if c and c not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"Column(s) not in file: {', '.join(missing)}")
+
+        for line_no, r in enumerate(reader, start=2):
+            try:
+                date, tx_type, amount, category, note = check_row(
+                    dates,
+                    r[mapping.date] or "",
+                    r[mapping.amount] or "",
+                    (r[mapping.type] or "") if mapping.type else None,
+                    (r[mapping.category] or "") if mapping.category else "",
+                    (r[mapping.note] or "") if mapping.note else "",
+                    mapping.date_format,
+                    mapping.default_category,
+                )
+            except ValueError as e:
+                errors.append((line_no, str(e)))
+                continue
+            rows.append({"date": date, "type": tx_type, "amount": amount, "category": category, "note": note})
+    return rows, errors
@@ -0,0 +1,358 @@
+import csv
+import json
+import os
+import threading
+from pathlib import Path
+
+from budget_binary import SUFFIX as BINARY_SUFFIX, write_binary
+from budget_lock import FileLock
+from budget_rollup import write_rollup
+
+FIELDS = ["date", "type", "amount", "category", "note"]
+COMPACT_AT = 1000  # journal records before the journal is folded into a new snapshot
+
+
+def _fingerprint(path: Path):
+    # size + mtime identify which snapshot a state file was written for (os.replace keeps both)
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _identity(path: Path):
+    # which file is at path right now; a trim renames a new journal in, so this changes
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_dev, st.st_ino)
+
+
+def _fsync_write(path: Path, text: str):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def write_snapshot_tmp(path: Path, transactions, month_key=None) -> Path:
+    """Write transactions to a temp file next to path and return it (caller renames it into place).
+
+    The format follows path's extension: *.budget is the binary format, anything else CSV.
+    The name is unique per process and thread, so writers need not hold the lock.
+    """
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        if path.suffix == BINARY_SUFFIX:
+            write_binary(tmp, transactions, month_key)
+            return tmp
+        with open(tmp, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            for tx in transactions:
+                writer.writerow(tx)
+            f.flush()
+            os.fsync(f.fileno())
+        return tmp
+    except BaseException:
+        tmp.unlink(missing_ok=True)  # unique names would otherwise pile up
+        raise
+
+
+def apply_record(transactions: list, rec: dict):
+    op = rec["op"]
+    if op == "add":
+        transactions.append(rec["tx"])
+    elif op == "add_many":
+        transactions.extend(rec["txs"])
+    elif op == "edit":
+        transactions[rec["index"]] = rec["tx"]
+    elif op == "delete":
+        if hasattr(transactions, "delete_many"):
+            transactions.delete_many(sorted(rec["indices"]))
+        else:
+            for idx in sorted(rec["indices"], reverse=True):
+                transactions.pop(idx)
+    elif op == "insert":
+        # undo of a delete: rows go back to the (ascending) positions they were deleted from
+        if hasattr(transactions, "insert_many"):
+            transactions.insert_many(rec["indices"], rec["txs"])
+        else:
+            for idx, tx in zip(rec["indices"], rec["txs"]):
+                transactions.insert(idx, tx)
+
+
+class BudgetJournal:
+    """Append-only log of add/edit/delete records on top of the CSV snapshot in data_file.
+
+    Every record is fsynced before the call returns. Once the journal holds compact_at
+    records they are folded into a new snapshot on a worker thread.
+
+    Several processes may share one journal. Records carry sequence numbers that are
+    unique across all of them, and the state file stamps the snapshot with the last
+    sequence number it contains. Appends, catching up (read_new) and putting a new
+    snapshot in place all happen under lock, an advisory lock on a file next to data_file.
+    """
+
+    def __init__(self, data_file: Path, compact_at: int = COMPACT_AT, month_key=None):
+        self.data_file = data_file
+        self.month_key = month_key  # lets binary snapshots carry a month directory
+        self.journal_file = data_file.with_name(data_file.stem + ".journal")
+        self.state_file = data_file.with_name(data_file.stem + ".journal.state")
+        self.lock = FileLock(data_file.with_name(data_file.stem + ".lock"))
+        self.compact_at = compact_at
+
+        self.seq = 0  # last sequence number handed out
+        self.pending = 0  # records in the live journal
+        self.last_error = None  # exception from the last background compaction, if any
+        self._worker = None
+        self._tail = (None, 0, 0, 0)  # (journal identity, bytes read or written by us, last seq there, its line length)
+        self._seen = None  # disk_signature() as of our last look
+
+    # ---------- Replay ----------
+    def has_records(self) -> bool:
+        return self.journal_file.exists()
+
+    def _read_state(self) -> dict:
+        try:
+            return json.loads(self.state_file.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _records(self, path: Path):
+        if not path.exists():
+            return
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # torn write from a crash
+
+    def replay(self, transactions: list, before=None):
+        """Apply the records the snapshot in data_file does not contain yet. Caller holds lock.
+
+        before(rec), if given, is called ahead of each record, while the rows it changes are still there.
+        """
+        state = self._read_state()
+        # The state file names the snapshot it describes; if the rename never happened, replay everything
+        applied = state.get("seq", 0) if state.get("snapshot") == _fingerprint(self.data_file) else 0
+
+        self.seq = max(self.seq, state.get("seq", 0))
+        self.pending = 0
+        for rec in self._records(self.journal_file):
+            self.seq = max(self.seq, rec["seq"])
+            if rec["seq"] <= applied:
+                continue
+            if before is not None:
+                before(rec)
+            apply_record(transactions, rec)
+            applied = rec["seq"]
+            self.pending += 1
+        self._tail = (None, 0, 0, 0)  # the first read_new() scans the whole journal once
+        self._seen = self.disk_signature()
+
+    def snapshot_fingerprint(self):
+        return _fingerprint(self.data_file)
+
+    # ---------- Other processes ----------
+    def disk_signature(self):
+        """Cheap stamp that changes whenever any process appends or writes a snapshot."""
+        stamps = []
+        for path in (self.journal_file, self.state_file):
+            try:
+                st = path.stat()
+                stamps.append((st.st_ino, st.st_size, st.st_mtime_ns))
+            except FileNotFoundError:
+                stamps.append(None)
+        return tuple(stamps)
+
+    def changed_on_disk(self) -> bool:
+        return self.disk_signature() != self._seen
+
+    def _resume_offset(self, f, ident) -> int:
+        tail_ident, offset, last_seq, last_len = self._tail
+        if tail_ident != ident or not last_len:
+            return 0
+        # a deleted journal's inode number can be reused by the next one, so check that
+        # the record we saw last still ends at offset
+        f.seek(offset - last_len)
+        line = f.read(last_len)
+        try:
+            same = line.endswith(b"\n") and json.loads(line).get("seq") == last_seq
+        except ValueError:
+            same = False
+        return offset if same else 0
+
+    def read_new(self):
+        """Records other processes journaled since we last read or wrote, oldest first.
+
+        Returns None when some of them were already folded into a newer snapshot and
+        trimmed from the journal; the snapshot then has to be read again. Caller holds lock.
+        """
+        records = []
+        ident = _identity(self.journal_file)
+        self._tail = (None, 0, 0, 0)
+        if ident is not None:
+            with open(self.journal_file, "rb") as f:
+                offset = self._resume_offset(f, ident)
+                f.seek(offset)
+                tail = (ident, offset, 0, 0)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # torn by a crash; the next append starts a fresh line after it
+                    offset += len(line)
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue
+                    tail = (ident, offset, rec["seq"], len(line))
+                    if rec["seq"] > self.seq:
+                        records.append(rec)
+            self._tail = tail
+        self._seen = self.disk_signature()
+
+        newest_snapshot = self._read_state().get("seq", 0)
+        if records and records[0]["seq"] > self.seq + 1 or not records and newest_snapshot > self.seq:
+            return None
+        if records:
+            self.seq = records[-1]["seq"]
+            self.pending += len(records)
+        return records
+
+    # ---------- Recording ----------
+    def _append(self, rec: dict):
+        # caller holds lock. The file is opened per record: another process may have
+        # trimmed (replaced) the journal since our last write, and an open handle would
+        # keep it from being replaced on Windows.
+        self.seq += 1
+        rec["seq"] = self.seq
+        line = (json.dumps(rec) + "\n").encode("ascii")  # json.dumps escapes anything non-ASCII
+        self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.journal_file, "a+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size:
+                f.seek(size - 1)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")  # torn last line from a crash
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+            st = os.fstat(f.fileno())
+        self.pending += 1
+        self._tail = ((st.st_dev, st.st_ino), st.st_size, self.seq, len(line))
+        self._seen = self.disk_signature()
+
+    def record_add(self, tx: dict):
+        self._append({"op": "add", "tx": tx})
+
+    def record_add_many(self, txs: list):
+        # one fsync for the whole batch; it still counts row by row toward compaction
+        self._append({"op": "add_many", "txs": txs})
+        self.pending += len(txs) - 1
+
+    def record_edit(self, index: int, tx: dict):
+        self._append({"op": "edit", "index": index, "tx": tx})
+
+    def record_delete(self, indices):
+        self._append({"op": "delete", "indices": list(indices)})
+
+    def record_insert(self, indices, txs: list):
+        self._append({"op": "insert", "indices": list(indices), "txs": txs})
+        self.pending += len(txs) - 1
+
+    def needs_compaction(self) -> bool:
+        return self.pending >= self.compact_at
+
+    # ---------- Compaction ----------
+    def _trim(self, seq: int):
+        """Drop the records up to seq, which the snapshot now holds; later ones stay."""
+        kept = [rec for rec in self._records(self.journal_file) if rec["seq"] > seq]
+        if kept:
+            tmp = self.journal_file.with_name(self.journal_file.name + ".tmp")
+            _fsync_write(tmp, "".join(json.dumps(rec) + "\n" for rec in kept))
+            os.replace(tmp, self.journal_file)
+        elif self.journal_file.exists():
+            self.journal_file.unlink()
+        self.pending = len(kept)
+
+    def _stale(self, seq: int) -> bool:
+        # caller holds lock
+        state = self._read_state()
+        return state.get("seq", 0) >= seq and state.get("snapshot") == _fingerprint(self.data_file)
+
+    def _write_snapshot(self, rows, seq: int, totals=None):
+        # caller holds lock
+        if self._stale(seq):
+            return  # another process already wrote a snapshot at least this new; never go back
+        self.data_file.parent.mkdir(parents=True, exist_ok=True)
+        self._install(write_snapshot_tmp(self.data_file, rows, self.month_key), seq, totals)
+
+    def _install(self, tmp: Path, seq: int, totals=None):
+        """Rename the snapshot in tmp into place as the one holding records up to seq. Caller holds lock."""
+        state_tmp = self.state_file.with_name(self.state_file.name + ".tmp")
+        _fsync_write(state_tmp, json.dumps({"seq": seq, "snapshot": _fingerprint(tmp)}))
+        os.replace(state_tmp, self.state_file)
+        os.replace(tmp, self.data_file)
+        self._trim(seq)
+        if totals is not None:
+            try:
+                write_rollup(self.data_file, _fingerprint(self.data_file), totals)
+            except OSError:
+                pass  # only a cache; the next load recomputes the totals and writes it again
+
+    def _background_snapshot(self, rows, seq: int, totals):
+        # the rows are our own copy, so the slow part runs without the lock; other
+        # processes (and the UI thread) only wait for the renames
+        tmp = None
+        try:
+            self.data_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = write_snapshot_tmp(self.data_file, rows, self.month_key)
+            with self.lock:
+                if not self._stale(seq):
+                    self._install(tmp, seq, totals)
+                    tmp = None
+        except Exception as e:
+            self.last_error = e
+        finally:
+            if tmp is not None:
+                tmp.unlink(missing_ok=True)
+
+    def compact(self, transactions, background: bool = True, bump: bool = False, totals: dict = None):
+        """Write transactions as the new snapshot and drop the journal records it covers.
+
+        The caller holds lock and has caught up with other processes, so the rows include
+        every record up to seq. A background write takes the lock again on its worker
+        thread for the renames only. bump claims a new sequence number, for changes
+        that never went through the journal (bulk imports). totals, the rows' group
+        totals, are saved as the snapshot's rollup (see budget_rollup).
+        """
+        if self.busy():
+            if background:
+                return
+            raise RuntimeError("wait() for the background snapshot before taking the lock")
+
+        # rows are copied here so the worker never sees later mutations
+        rows = transactions.copy()
+        if bump:
+            self.seq += 1
+        seq = self.seq
+        self.last_error = None
+        if background:
+            self._worker = threading.Thread(target=self._background_snapshot, args=(rows, seq, totals), daemon=True)
+            self._worker.start()
+        else:
+            self._write_snapshot(rows, seq, totals)
+
+    def busy(self) -> bool:
+        return self._worker is not None and self._worker.is_alive()
+
+    def wait(self):
+        if self._worker is not None:
+            self._worker.join()
+            self._worker = None
+
+    def close(self):
+        self.wait()
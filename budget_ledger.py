@@ -0,0 +1,693 @@
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+from math import isclose
+from pathlib import Path
+
+from budget_aggregate import group_totals, report, rollup
+from budget_binary import SUFFIX as BINARY_SUFFIX, read_binary
+from budget_import import parse_amount, parse_date
+from budget_journal import BudgetJournal
+from budget_rollup import read_rollup, write_rollup
+from budget_search import parse_query, SearchIndex
+from budget_store import TransactionStore, date_ordinal, ordinal_month, read_csv
+
+APP_DIR = Path.home() / "BudgetApp"  # created on first write, not at import
+DATA_FILE = APP_DIR / "budget_data.csv"  # a .budget extension selects the binary format
+DB_FILE = APP_DIR / "budget_data.db"  # used instead of DATA_FILE when a ledger is opened with sqlite
+UNDO_LIMIT = 100  # commands kept for undo; each holds only the rows it changed
+
+TYPES = ("Income", "Expense")
+CATEGORIES = ["Groceries", "Dining", "Gas", "Bills", "Shopping", "Health", "Entertainment", "Other"]
+
+
+@lru_cache(maxsize=65536)
+def month_key(date_str: str) -> int:
+    """year * 12 + month - 1 for an MM-DD-YYYY date (-1 if unparseable); sorts chronologically."""
+    return ordinal_month(date_ordinal(date_str))
+
+
+def month_label(key: int) -> str:
+    """MM-YYYY text for a month key, as shown to users."""
+    if key < 0:
+        return "Unknown"
+    year, month = divmod(key, 12)
+    return f"{month + 1:02d}-{year:04d}"
+
+
+def parse_month(text: str) -> int:
+    """Month key for MM-YYYY (or YYYY-MM) text; raises ValueError."""
+    for fmt in ("%m-%Y", "%Y-%m"):
+        try:
+            day = datetime.strptime(text.strip(), fmt)
+        except ValueError:
+            continue
+        return day.year * 12 + day.month - 1
+    raise ValueError(f"bad month {text!r} (use MM-YYYY)")
+
+
+class LedgerChanged(RuntimeError):
+    """Another process moved rows around, so row ids the caller is holding may be stale."""
+
+
+def make_tx(date: str, tx_type: str, amount, category: str = "Other", note: str = "") -> dict:
+    """Validate raw field values and return a transaction dict; raises ValueError."""
+    if tx_type not in TYPES:
+        raise ValueError(f"Unknown type {tx_type!r}")
+    amount = parse_amount(amount) if isinstance(amount, str) else float(amount)
+    if not amount > 0:
+        raise ValueError(f"{tx_type} must be > 0")
+    return {
+        "date": parse_date(date),
+        "type": tx_type,
+        "amount": amount,
+        "category": "Income" if tx_type == "Income" else category,  # keep consistent
+        "note": note.strip(),
+    }
+
+
+class BudgetLedger:
+    """The budget data and every operation on it, with no UI.
+
+    Rows live in a TransactionStore (or SQLite when db_file is given). The month
+    index and running totals are updated by each add/edit/delete, and every change
+    is journaled next to data_file until the next save.
+
+    Other processes may have the same data_file open. Each change first takes the
+    journal's file lock and applies whatever they journaled since (poll_changes does the
+    same on demand), so nobody's records or snapshots are overwritten.
+    """
+
+    def __init__(self, data_file: Path = DATA_FILE, db_file: Path = None):
+        self.data_file = data_file
+        self.db_file = db_file
+        self.transactions = TransactionStore()  # columnar; rows come back as dicts
+        self.db = None
+        if db_file is not None:
+            from budget_sqlite import SqliteStore  # sqlite3 is only imported when asked for
+
+            db_file.parent.mkdir(parents=True, exist_ok=True)
+            self.db = SqliteStore(db_file, month_key)
+            self.transactions = self.db  # same row access, answered by SQLite
+        self.month_index = {}  # month key -> sorted list of indices into self.transactions
+        self.rollup_months = None  # months from the rollup while the rows are still loading
+        self.search_index = SearchIndex(self.transactions)  # built by the first search (memory mode only)
+        self.category_totals = {}  # (month, type, category) -> running amount
+        self.month_totals = {}  # (month, type) -> running amount
+        self.grand_totals = {"Income": 0.0, "Expense": 0.0}
+        self.totals_touched = set()  # months whose running totals moved since they were last summed row by row
+        self.journal = BudgetJournal(data_file, month_key=month_key)  # every add/edit/delete is fsynced here
+        self.snapshot_seen = None  # fingerprint of the snapshot the rows were read from
+        self.undo_log = deque(maxlen=UNDO_LIMIT)  # ("add", ids, txs) | ("edit", id, old, new) | ("delete", ids, txs)
+        self.redo_log = []
+        self.on_change = None  # called after every journaled change, e.g. to schedule an autosave
+        self.generation = 0  # goes up whenever rows are renumbered under the caller (reload, another process)
+
+    # ---------- Month index ----------
+    def _rebuild_month_index(self):
+        self.month_index = {}
+        self.rollup_months = None
+        # month numbers were worked out once per distinct date when the rows were stored
+        months = self.transactions.date_months
+        for tx_index, date_code in enumerate(self.transactions.date_codes):
+            self.month_index.setdefault(months[date_code], []).append(tx_index)
+
+    def _index_add(self, tx_index: int):
+        insort(self.month_index.setdefault(self.transactions.month(tx_index), []), tx_index)
+
+    def _index_remove(self, tx_index: int):
+        month = self.transactions.month(tx_index)
+        bucket = self.month_index[month]
+        del bucket[bisect_left(bucket, tx_index)]
+        if not bucket:
+            del self.month_index[month]
+
+    def _index_shift_after_delete(self, removed):
+        """Renumber indexed rows after the (ascending) indices in removed were popped."""
+        first = removed[0]
+        for bucket in self.month_index.values():
+            # buckets are sorted, so only the tail past the first removed row moves
+            for pos in range(bisect_left(bucket, first), len(bucket)):
+                bucket[pos] -= bisect_left(removed, bucket[pos])
+
+    def _index_shift_before_insert(self, inserted):
+        """Renumber indexed rows for rows about to land at the (ascending) indices in inserted."""
+        # inserted[j] - j is where row j goes in the current numbering; rows at or past it move up
+        gaps = [idx - j for j, idx in enumerate(inserted)]
+        for bucket in self.month_index.values():
+            for pos in range(bisect_left(bucket, gaps[0]), len(bucket)):
+                bucket[pos] += bisect_right(gaps, bucket[pos])
+
+    # ---------- Running totals ----------
+    def _rebuild_totals(self):
+        # one grouped reduction (NumPy when installed) instead of a delta per row
+        self.category_totals = group_totals(self.transactions, month_key)
+        self.month_totals, self.grand_totals = rollup(self.category_totals)
+        self.totals_touched = set()
+
+    def _totals_apply(self, tx: dict, sign: int):
+        # sign is +1 when a row enters the ledger and -1 when it leaves
+        month = month_key(tx["date"])
+        self.totals_touched.add(month)
+        delta = sign * tx["amount"]
+        for store, key in (
+            (self.category_totals, (month, tx["type"], tx["category"])),
+            (self.month_totals, (month, tx["type"])),
+        ):
+            value = store.get(key, 0.0) + delta
+            if sign < 0 and isclose(value, 0.0, abs_tol=1e-9):
+                store.pop(key, None)
+            else:
+                store[key] = value
+        self.grand_totals[tx["type"]] = self.grand_totals.get(tx["type"], 0.0) + delta
+
+    def check_totals(self) -> list:
+        """Compare the running totals with a full recompute; returns the keys that disagree."""
+        expected = group_totals(self.transactions, month_key)
+        month_totals, grand_totals = rollup(expected)
+        expected.update(month_totals)
+        expected.update({("All", t): v for t, v in grand_totals.items()})
+
+        cached = dict(self.category_totals)
+        cached.update(self.month_totals)
+        cached.update({("All", t): v for t, v in self.grand_totals.items()})
+
+        bad = []
+        for key in expected.keys() | cached.keys():
+            if not isclose(expected.get(key, 0.0), cached.get(key, 0.0), abs_tol=0.005):
+                bad.append(key)
+        return sorted(bad, key=lambda k: (k[0] == "All", k))  # month keys are ints, so "All" sorts apart
+
+    # ---------- Queries ----------
+    def __len__(self):
+        return len(self.transactions)
+
+    def get(self, tx_index: int) -> dict:
+        return self.transactions[tx_index]
+
+    def ids(self, month="All"):
+        """Transaction indices in one month (or "All"), oldest row first."""
+        if self.db is not None:
+            return self.db.ids(month)
+        if month == "All":
+            return range(len(self.transactions))
+        return self.month_index.get(month, [])
+
+    def rows(self, ids):
+        """Yield (index, tx) for ids, in the given order."""
+        if self.db is not None:
+            return self.db.rows(ids)  # one query per chunk instead of one per row
+        return ((i, self.transactions[i]) for i in ids)
+
+    def query(self, month="All") -> list:
+        return [tx for _, tx in self.rows(self.ids(month))]
+
+    def months(self) -> list:
+        """Month keys that have rows, newest first."""
+        if self.db is not None:
+            return self.db.months()
+        if self.rollup_months is not None:
+            return self.rollup_months
+        return sorted(self.month_index, reverse=True)
+
+    def totals(self, month="All"):
+        """Return (income, expenses) for a month key, or for everything when month is "All"."""
+        if self.db is not None:
+            return self.db.totals(month)
+        if month == "All":
+            return self.grand_totals.get("Income", 0.0), self.grand_totals.get("Expense", 0.0)
+        return self.month_totals.get((month, "Income"), 0.0), self.month_totals.get((month, "Expense"), 0.0)
+
+    def totals_of(self, ids) -> tuple:
+        """Return (income, expenses) summed over the given row ids."""
+        sums = {"Income": 0.0, "Expense": 0.0}
+        if self.db is not None:
+            for _, tx in self.db.rows(ids):
+                sums[tx["type"]] += tx["amount"]
+            return sums["Income"], sums["Expense"]
+        store = self.transactions
+        by_code = [0.0] * len(store.types.values)
+        amounts, type_codes = store.amounts, store.type_codes
+        for i in ids:
+            by_code[type_codes[i]] += amounts[i]
+        for code, tx_type in enumerate(store.types.values):
+            sums[tx_type] = sums.get(tx_type, 0.0) + by_code[code]
+        return sums["Income"], sums["Expense"]
+
+    def category_totals_for(self, month="All") -> dict:
+        """Return {(type, category): amount} for a month, or for everything when month is "All"."""
+        if self.db is not None:
+            return self.db.category_totals(month)
+        out = {}
+        for (m, t, c), amount in self.category_totals.items():
+            if month == "All" or m == month:
+                out[(t, c)] = out.get((t, c), 0.0) + amount
+        return out
+
+    def search(self, query) -> list:
+        """Ids of the rows matching query (search box text or a budget_search.Query), oldest first."""
+        if isinstance(query, str):
+            query = parse_query(query)
+        if self.db is not None:
+            return self.db.search(query)
+        return self.search_index.search(query)
+
+    def report(self) -> dict:
+        """Per-month totals, expense categories and running balance for the whole ledger."""
+        return report(self.transactions, month_key)
+
+    # ---------- Mutations ----------
+    def add(self, tx: dict) -> int:
+        """Add one row; returns its id."""
+        return self.add_many([tx])[0]
+
+    def add_many(self, txs: list):
+        """Add rows after everything other processes have added; returns their ids, in order."""
+        txs = list(txs)
+        if not txs:
+            return range(0)
+        with self._writing():
+            ids = self._add_rows(txs)
+            self._push(("add", ids, txs))
+        return ids
+
+    def edit(self, tx_index: int, tx: dict, generation: int = None):
+        """Raises LedgerChanged if rows moved since generation (or just now), as tx_index may be stale."""
+        with self._writing(positional=True, generation=generation):
+            self._push(("edit", tx_index, self._edit_row(tx_index, tx), tx))
+
+    def delete(self, indices, generation: int = None):
+        """Raises KeyError for an id with no row, and LedgerChanged like edit()."""
+        indices = sorted(set(indices))
+        if indices:
+            with self._writing(positional=True, generation=generation):
+                missing = self._missing(indices)
+                if missing:
+                    raise KeyError(missing[0])
+                self._push(("delete",) + self._delete_rows(indices))
+
+    def _missing(self, ids: list) -> list:
+        if self.db is not None:
+            found = {tx_id for tx_id, _ in self.db.rows(ids)}
+            return [tx_id for tx_id in ids if tx_id not in found]
+        return [i for i in ids if not 0 <= i < len(self.transactions)]
+
+    def import_rows(self, rows) -> int:
+        """Bulk-append validated (date, type, amount, category, note) tuples and save.
+
+        Meant for batch jobs: rows go straight into the columns (no dict per row) and the
+        batch is made durable by one snapshot write instead of a journal record. It is
+        not undoable.
+        """
+        self.undo_log.clear()
+        self.redo_log.clear()
+        if self.db is not None:
+            return self.db.add_rows(rows)
+        self.journal.wait()
+        with self._writing():  # the rows go after everything other processes have added
+            start = len(self.transactions)
+            append = self.transactions.append_fields
+            try:
+                for r in rows:
+                    append(*r)
+            except BaseException:
+                self.transactions.truncate(start)  # a bad row fails the whole batch, like SQLite's rollback
+                raise
+            added = len(self.transactions) - start
+            if added:
+                self._rebuild_derived()
+                # the rows are in no journal record, so the snapshot takes a sequence number of its own
+                self._compact(background=False, bump=True)
+        return added
+
+    # Each primitive updates storage, month index, running totals and journal together,
+    # and returns what its inverse needs. Ids are row indices, or SQLite ids in db mode.
+    # log=False applies a record another process already journaled.
+    def _add_rows(self, txs: list, log: bool = True):
+        if self.db is not None:
+            return self.db.add_many(txs)  # one SQLite transaction
+        start = len(self.transactions)
+        self.transactions.extend(txs)
+        for tx_index in range(start, len(self.transactions)):
+            self._index_add(tx_index)
+            self.search_index.add(tx_index)
+        for tx in txs:
+            self._totals_apply(tx, 1)
+        if log:
+            if len(txs) == 1:
+                self.journal.record_add(txs[0])
+            else:
+                self.journal.record_add_many(txs)
+            self._changed()
+        return range(start, len(self.transactions))
+
+    def _edit_row(self, tx_index: int, tx: dict, log: bool = True) -> dict:
+        old = self.transactions[tx_index]
+        if self.db is not None:
+            self.db.update(tx_index, tx)
+            return old
+        self._index_remove(tx_index)
+        self._totals_apply(old, -1)
+        self.search_index.discard(tx_index)
+        self.transactions[tx_index] = tx
+        self.search_index.add(tx_index)
+        self._index_add(tx_index)
+        self._totals_apply(tx, 1)
+        if log:
+            self.journal.record_edit(tx_index, tx)
+            self._changed()
+        return old
+
+    def _delete_rows(self, indices: list, log: bool = True):
+        # indices must be ascending
+        if self.db is not None:
+            found = list(self.db.rows(indices))
+            ids = [tx_id for tx_id, _ in found]
+            self.db.delete(ids)
+            return ids, [tx for _, tx in found]
+        txs = []
+        for idx in indices:
+            tx = self.transactions[idx]
+            txs.append(tx)
+            self._index_remove(idx)
+            self._totals_apply(tx, -1)
+        self.search_index.delete(indices)
+        self.transactions.delete_many(indices)
+        self._index_shift_after_delete(indices)
+        if log:
+            self.journal.record_delete(indices)
+            self._changed()
+        return indices, txs
+
+    def _insert_rows(self, indices, txs: list, log: bool = True):
+        # the inverse of _delete_rows: rows go back to the ascending positions they came from
+        if self.db is not None:
+            try:
+                self.db.insert_rows(indices, txs)
+            except KeyError:
+                # another connection has taken those ids since, so this history can't be replayed
+                self.undo_log.clear()
+                self.redo_log.clear()
+                raise LedgerChanged("The ledger was changed in another window, so this can't be undone or redone.")
+            return
+        self._index_shift_before_insert(indices)
+        self.transactions.insert_many(indices, txs)
+        self.search_index.insert(indices)
+        for idx, tx in zip(indices, txs):
+            self._index_add(idx)
+            self._totals_apply(tx, 1)
+        if log:
+            self.journal.record_insert(indices, txs)
+            self._changed()
+
+    # ---------- Undo / redo ----------
+    def _push(self, command: tuple):
+        self.undo_log.append(command)
+        self.redo_log.clear()
+
+    def can_undo(self) -> bool:
+        return bool(self.undo_log)
+
+    def can_redo(self) -> bool:
+        return bool(self.redo_log)
+
+    def undo(self) -> bool:
+        """Revert the last add/edit/delete; returns False when there is nothing to undo."""
+        with self._writing():  # drops the history if another process moved rows
+            if not self.undo_log:
+                return False
+            command = self.undo_log.pop()
+            op = command[0]
+            if op == "add":
+                self._delete_rows(list(command[1]))
+            elif op == "edit":
+                self._edit_row(command[1], command[2])
+            elif op == "delete":
+                self._insert_rows(command[1], command[2])
+            self.redo_log.append(command)
+            return True
+
+    def redo(self) -> bool:
+        with self._writing():
+            if not self.redo_log:
+                return False
+            command = self.redo_log.pop()
+            op = command[0]
+            if op == "add":
+                self._insert_rows(command[1], command[2])  # same slots (or SQLite ids) as the first time
+            elif op == "edit":
+                self._edit_row(command[1], command[3])
+            elif op == "delete":
+                self._delete_rows(command[1])
+            self.undo_log.append(command)
+            return True
+
+    def _changed(self):
+        # Fold a long journal into a fresh snapshot off the caller's thread
+        if self.journal.needs_compaction():
+            self._compact()
+        if self.on_change is not None:
+            self.on_change()
+
+    # ---------- Other processes ----------
+    @contextmanager
+    def _writing(self, positional: bool = False, generation: int = None):
+        """Hold the journal lock, with every other process's changes applied first.
+
+        positional means the caller picked row ids before that, so rows having moved
+        in the meantime raises LedgerChanged instead of changing the wrong rows. When
+        the ids were picked earlier still (a selection, an open dialog), generation is
+        self.generation as it was then, which also catches moves poll_changes applied.
+        """
+        if self.db is not None:  # SQLite does its own locking, and its ids never move
+            yield
+            return
+        with self.journal.lock:
+            _, moved = self._catch_up()
+            if positional and (moved or generation is not None and generation != self.generation):
+                raise LedgerChanged("The ledger was changed in another window; check the rows and try again.")
+            yield
+
+    def _catch_up(self):
+        """Apply what other processes journaled since our last look; returns (changed, rows_moved).
+
+        Caller holds the journal lock.
+        """
+        if not self.journal.changed_on_disk():
+            return False, False
+        records = self.journal.read_new()
+        if records is None:
+            # some of them are only in a newer snapshot now, so read that one
+            self._read_snapshot()
+            self._replay_and_rebuild()
+            return True, True
+        moved = False
+        for rec in records:
+            op = rec["op"]
+            if op == "add":
+                self._add_rows([rec["tx"]], log=False)
+            elif op == "add_many":
+                self._add_rows(rec["txs"], log=False)
+            elif op == "edit":
+                self._edit_row(rec["index"], rec["tx"], log=False)
+            elif op == "delete":
+                self._delete_rows(sorted(rec["indices"]), log=False)
+                moved = True
+            elif op == "insert":
+                self._insert_rows(rec["indices"], rec["txs"], log=False)
+                moved = True
+        if moved:
+            # our undo history holds row positions from before
+            self.generation += 1
+            self.undo_log.clear()
+            self.redo_log.clear()
+        return bool(records), moved
+
+    def poll_changes(self) -> bool:
+        """Apply changes other processes made since the last look; True if there were any.
+
+        Costs a couple of stat calls (one pragma with SQLite) when nothing changed.
+        """
+        if self.db is not None:
+            return self.db.changed_elsewhere()
+        if not self.journal.changed_on_disk() or self.journal.busy():
+            return False  # while our own snapshot write holds the lock, look again next time
+        with self.journal.lock:
+            changed, _ = self._catch_up()
+        return changed
+
+    # ---------- Rollup ----------
+    def _resum_months(self, totals: dict, months):
+        """Replace the entries of totals for months with sums over their rows, in row order like group_totals."""
+        if not months:
+            return
+        for key in [k for k in totals if k[0] in months]:
+            del totals[key]
+        store = self.transactions
+        types, cats = store.types.values, store.categories.values
+        type_codes, cat_codes, amounts = store.type_codes, store.category_codes, store.amounts
+        for month in months:
+            for i in self.month_index.get(month, ()):
+                key = (month, types[type_codes[i]], cats[cat_codes[i]])
+                totals[key] = totals.get(key, 0.0) + amounts[i]
+
+    def _record_months(self, rec: dict) -> list:
+        # months a journal record changes, looked up before it is applied
+        op = rec["op"]
+        if op == "add":
+            return [month_key(rec["tx"]["date"])]
+        if op in ("add_many", "insert"):
+            return [month_key(tx["date"]) for tx in rec["txs"]]
+        if op == "edit":
+            return [self.transactions.month(rec["index"]), month_key(rec["tx"]["date"])]
+        return [self.transactions.month(i) for i in rec["indices"]]
+
+    def _snapshot_totals(self):
+        """Group totals of the snapshot rows just read: the rollup's, or summed and saved as a new rollup."""
+        if self.snapshot_seen is None:
+            return None  # no snapshot yet, only a journal
+        totals = read_rollup(self.data_file, self.snapshot_seen)
+        if totals is None:
+            totals = group_totals(self.transactions, month_key)
+            try:
+                write_rollup(self.data_file, self.snapshot_seen, totals)
+            except OSError:
+                pass  # e.g. a read-only folder; the totals are recomputed next time
+        return totals
+
+    def _compact(self, background: bool = True, bump: bool = False):
+        # running totals drift by float rounding, so months changed since the last
+        # snapshot are summed again before they go into its rollup
+        if self.totals_touched:
+            self._resum_months(self.category_totals, self.totals_touched)
+            self.month_totals, self.grand_totals = rollup(self.category_totals)
+            self.totals_touched = set()
+        self.journal.compact(self.transactions, background, bump, totals=dict(self.category_totals))
+
+    def preload_rollup(self) -> bool:
+        """Take months and totals from the snapshot's rollup before its rows are read.
+
+        Call after reset(); finish_load() replaces them with the real index and totals.
+        Nothing is taken while the journal has records, since the rollup would miss them.
+        """
+        if self.db is not None or self.snapshot_seen is None or self.journal.has_records():
+            return False
+        totals = read_rollup(self.data_file, self.snapshot_seen)
+        if totals is None:
+            return False
+        self.category_totals = totals
+        self.month_totals, self.grand_totals = rollup(totals)
+        self.rollup_months = sorted({m for m, _, _ in totals}, reverse=True)
+        return True
+
+    # ---------- Persistence ----------
+    def has_data(self) -> bool:
+        return self.db is not None or self.data_file.exists() or self.journal.has_records()
+
+    def reset(self):
+        """Drop every in-memory row, e.g. before a reload."""
+        self.transactions.clear()
+        self.generation += 1
+        self.snapshot_seen = self.journal.snapshot_fingerprint()
+        self.month_index = {}
+        self.rollup_months = None
+        self.search_index.invalidate()
+        self._rebuild_totals()
+        self.undo_log.clear()
+        self.redo_log.clear()
+
+    def _read_snapshot(self):
+        self.reset()
+        if self.data_file.exists():
+            if self.data_file.suffix == BINARY_SUFFIX:
+                # column blocks are copied straight out of the mmap
+                read_binary(self.data_file, self.transactions)
+            else:
+                read_csv(self.data_file, self.transactions)
+
+    def _rebuild_derived(self):
+        self.search_index.invalidate()
+        self._rebuild_month_index()
+        self._rebuild_totals()
+
+    def _replay_and_rebuild(self):
+        """Replay the journal onto snapshot rows just read, then rebuild the index and totals.
+
+        Totals start from the snapshot's rollup when it is current, and only the months
+        the journal touches are summed again. Caller holds the journal lock.
+        """
+        totals = self._snapshot_totals()
+        touched = set()
+        self.journal.replay(self.transactions, before=lambda rec: touched.update(self._record_months(rec)))
+        self.search_index.invalidate()
+        self._rebuild_month_index()
+        if totals is None:
+            self._rebuild_totals()
+            return
+        self._resum_months(totals, touched)
+        self.category_totals = totals
+        self.month_totals, self.grand_totals = rollup(totals)
+        self.totals_touched = set()
+
+    def finish_load(self):
+        """Replay the journal onto the snapshot rows and rebuild the index and totals."""
+        if not self.has_data():
+            self._rebuild_derived()
+            return
+        self.journal.wait()
+        with self.journal.lock:
+            if self.journal.snapshot_fingerprint() != self.snapshot_seen:
+                self._read_snapshot()  # another process replaced it while it was being read
+            self._replay_and_rebuild()
+
+    def load(self):
+        """Read the snapshot (CSV or binary) plus the journal tail, all on the calling thread."""
+        if self.db is not None:
+            if self.db.needs_migration():
+                # one-shot import of the file ledger, journal included, the first time the database is used
+                source = BudgetLedger(self.data_file)
+                try:
+                    source.load()
+                    self.db.migrate(source.transactions)
+                finally:
+                    source.close()
+            return  # nothing else to read up front; queries go to the database
+
+        self._read_snapshot()
+        self.finish_load()
+
+    def save(self):
+        """Fold the journal into a new snapshot now (SQLite commits every change as it happens)."""
+        if self.db is None:
+            self.journal.wait()
+            with self._writing():
+                self._compact(background=False)
+
+    def is_dirty(self) -> bool:
+        """True while some changes are only in the journal, not yet in the snapshot."""
+        return self.db is None and self.journal.has_records()
+
+    def autosave(self) -> bool:
+        """Start folding the journal into a new snapshot on a worker thread.
+
+        Returns False if there was nothing to save or a write is still running (try again later).
+        """
+        if not self.is_dirty() or self.journal.busy():
+            return False
+        with self._writing():
+            self._compact()
+        return True
+
+    def saving(self) -> bool:
+        return self.journal.busy()
+
+    def save_error(self):
+        """Exception from the last background write, or None."""
+        return self.journal.last_error
+
+    def close(self):
+        self.journal.close()
+        if self.db is not None:
+            self.db.close()
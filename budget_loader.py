@@ -0,0 +1,103 @@
+import csv
+import io
+import os
+import queue
+import threading
+from pathlib import Path
+
+from budget_store import csv_tx
+
+CHUNK_ROWS = 5000  # rows per batch handed to the UI thread
+TAIL_BYTES = 256 * 1024  # how much of the end of the file the preview parses
+
+
+class _CountingLines:
+    """Line iterator over a text file that remembers how many characters it has handed out."""
+
+    def __init__(self, f):
+        self.f = f
+        self.read = 0
+
+    def __iter__(self):
+        for line in self.f:
+            self.read += len(line)
+            yield line
+
+
+class CsvStreamLoader:
+    """Parses a budget CSV on a worker thread and hands batches back through a queue.
+
+    The UI thread calls drain() (e.g. from after()) and gets a list of events:
+      ("preview", rows)     rows parsed from the end of the file, before anything else
+      ("rows", rows, frac)  the next batch in file order, frac = share of the file read
+      ("done",)             every row has been sent
+      ("error", exc)
+    Nothing is sent after cancel().
+    """
+
+    def __init__(self, path: Path, chunk_rows: int = CHUNK_ROWS, tail_bytes: int = TAIL_BYTES):
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.tail_bytes = tail_bytes
+        self.events = queue.Queue()
+        self.cancelled = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def drain(self) -> list:
+        out = []
+        while True:
+            try:
+                out.append(self.events.get_nowait())
+            except queue.Empty:
+                return out
+
+    def _put(self, event):
+        if not self.cancelled.is_set():
+            self.events.put(event)
+
+    def _read_tail(self, size: int) -> list:
+        # Best effort: the first partial line is dropped and anything that doesn't parse is skipped
+        with open(self.path, "r", newline="", encoding="utf-8") as f:
+            header = next(csv.reader(f))
+        with open(self.path, "rb") as f:
+            f.seek(size - self.tail_bytes)
+            text = f.read().decode("utf-8", errors="replace")
+        text = text[text.find("\n") + 1:]
+
+        rows = []
+        for values in csv.reader(io.StringIO(text, newline="")):
+            if len(values) != len(header):
+                continue
+            try:
+                rows.append(csv_tx(dict(zip(header, values))))
+            except ValueError:
+                continue
+        return rows
+
+    def _run(self):
+        try:
+            size = os.path.getsize(self.path)
+            if size > 2 * self.tail_bytes:
+                self._put(("preview", self._read_tail(size)))
+
+            with open(self.path, "r", newline="", encoding="utf-8") as f:
+                lines = _CountingLines(f)
+                batch = []
+                for r in csv.DictReader(lines):
+                    batch.append(csv_tx(r))
+                    if len(batch) >= self.chunk_rows:
+                        if self.cancelled.is_set():
+                            return
+                        self._put(("rows", batch, min(1.0, lines.read / max(size, 1))))
+                        batch = []
+                self._put(("rows", batch, 1.0))
+            self._put(("done",))
+        except Exception as e:
+            self._put(("error", e))
@@ -0,0 +1,123 @@
+"""Load test for budget_server.py over localhost.
+
+Starts a server on a throwaway ledger (unless --port points at a running one), then
+opens --clients keep-alive connections that send --requests requests in total, a
+--write-ratio share of them POST /expenses and the rest GET /totals. Prints a JSON
+summary with requests/sec and p50/p99 latency in milliseconds.
+
+    python budget_loadtest.py [--clients 50] [--requests 20000] [--write-ratio 0.2] [--port N]
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+CATEGORIES = ["Groceries", "Dining", "Gas", "Bills", "Shopping", "Health", "Entertainment", "Other"]
+
+
+def _request(method: str, path: str, payload=None) -> bytes:
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    head = f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n"
+    return head.encode("latin-1") + body
+
+
+async def _client(host: str, port: int, count: int, write_ratio: float, latencies: list, statuses: dict, seed: int):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(count):
+            if rng.random() < write_ratio:
+                req = _request("POST", "/expenses", {
+                    "date": f"{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}-2024",
+                    "amount": round(rng.uniform(1, 200), 2),
+                    "category": rng.choice(CATEGORIES),
+                    "note": "loadtest",
+                })
+            else:
+                req = _request("GET", "/totals")
+            t0 = time.perf_counter()
+            writer.write(req)
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - t0)
+            status = head.split(b" ", 2)[1].decode()
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run_load(host: str, port: int, clients: int, requests: int, write_ratio: float) -> dict:
+    latencies = []
+    statuses = {}
+    per_client = [requests // clients + (1 if n < requests % clients else 0) for n in range(clients)]
+    t0 = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, count, write_ratio, latencies, statuses, seed)
+        for seed, count in enumerate(per_client) if count
+    ))
+    elapsed = time.perf_counter() - t0
+
+    latencies.sort()
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+    return {
+        "clients": clients,
+        "requests": len(latencies),
+        "write_ratio": write_ratio,
+        "seconds": round(elapsed, 3),
+        "requests_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(pct(0.50), 3),
+        "p99_ms": round(pct(0.99), 3),
+        "max_ms": round(latencies[-1] * 1000, 3),
+        "statuses": statuses,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test budget_server.py.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="test an already running server instead of starting one")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    if args.port:
+        result = asyncio.run(run_load(args.host, args.port, args.clients, args.requests, args.write_ratio))
+        print(json.dumps(result, indent=2))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server = subprocess.Popen(
+            [sys.executable, "budget_server.py", "--host", args.host, "--port", "0",
+             "--data", str(Path(tmp) / "budget_data.csv")],
+            cwd=Path(__file__).resolve().parent,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        try:
+            line = server.stdout.readline()  # "listening on http://host:port"
+            if not line:
+                sys.exit("server did not start")
+            port = int(line.rsplit(":", 1)[1])
+            result = asyncio.run(run_load(args.host, port, args.clients, args.requests, args.write_ratio))
+        finally:
+            server.terminate()
+            server.wait()
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Report over many ledger files at once, e.g. one per household and year in APP_DIR.
+
+Each file is read (snapshot plus any journal tail) and grouped by (month, type,
+category) in a worker process; the small per-file totals are then merged in file
+order, so the result does not depend on which worker finished first.
+
+    python budget_multi.py [files or directories ...] [--workers N] [--format json|csv]
+
+With no paths, every *.csv and *.budget file in APP_DIR is included.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from budget_aggregate import group_totals, merge_groups, report_from_groups
+from budget_binary import SUFFIX as BINARY_SUFFIX, read_binary
+from budget_journal import BudgetJournal
+from budget_ledger import APP_DIR, month_key, month_label
+from budget_store import TransactionStore, read_csv
+
+SUFFIXES = (".csv", BINARY_SUFFIX)
+
+
+def ledger_files(paths) -> list:
+    """The ledger files named by paths, with directories expanded to the ledgers in them, sorted."""
+    files = []
+    for path in paths:
+        if path.is_dir():
+            files.extend(sorted(p for p in path.iterdir() if p.suffix in SUFFIXES and p.is_file()))
+        elif path.exists():
+            files.append(path)
+    return files
+
+
+def _read(path: Path, store: TransactionStore):
+    if path.exists():
+        if path.suffix == BINARY_SUFFIX:
+            read_binary(path, store)
+        else:
+            read_csv(path, store)
+
+
+def file_groups(path: Path):
+    """(rows, {(month, type, category): total}) for one ledger file; runs in a worker process."""
+    store = TransactionStore()
+    journal = BudgetJournal(path)
+    if journal.has_records():
+        # snapshot and journal have to be read as a pair, so no other process compacts in between
+        with journal.lock:
+            _read(path, store)
+            journal.replay(store)
+    else:
+        _read(path, store)
+    return len(store), group_totals(store, month_key)
+
+
+def aggregate(files, workers: int = None) -> tuple:
+    """Return ([rows per file], merged group totals) over files.
+
+    Files are spread over a pool of workers processes (default: one per core); with a
+    single file or workers=1 everything runs in this process instead.
+    """
+    files = list(files)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(files) < 2:
+        parts = [file_groups(f) for f in files]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(files))) as pool:
+            parts = list(pool.map(file_groups, files))  # map keeps file order
+    return [rows for rows, _ in parts], merge_groups(groups for _, groups in parts)
+
+
+def labelled_report(groups: dict) -> dict:
+    """report_from_groups() with MM-YYYY labels instead of month keys, ready for JSON."""
+    out = report_from_groups(groups)
+    return {
+        "months": {month_label(m): totals for m, totals in out["months"].items()},
+        "categories": {month_label(m): cats for m, cats in out["categories"].items()},
+        "balance_over_time": [[month_label(m), balance] for m, balance in out["balance_over_time"]],
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Monthly report over several ledger files, aggregated in parallel.")
+    parser.add_argument("paths", nargs="*", type=Path, help=f"ledger files or directories (default {APP_DIR})")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("--format", choices=["json", "csv"], default="json", help="csv writes the monthly totals only")
+    args = parser.parse_args(argv)
+
+    missing = [p for p in args.paths if not p.exists()]
+    if missing:
+        print(f"error: no such file or directory: {missing[0]}", file=sys.stderr)
+        return 1
+    files = ledger_files(args.paths or [APP_DIR])
+    if not files:
+        print("error: no ledger files found", file=sys.stderr)
+        return 1
+    try:
+        counts, groups = aggregate(files, args.workers)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    out = labelled_report(groups)
+
+    if args.format == "json":
+        out["files"] = [{"file": str(f), "rows": n} for f, n in zip(files, counts)]
+        json.dump(out, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        writer = csv.writer(sys.stdout, lineterminator="\n")
+        writer.writerow(["month", "income", "expenses", "balance"])
+        for label, t in out["months"].items():
+            writer.writerow([label, f"{t['income']:.2f}", f"{t['expenses']:.2f}", f"{t['balance']:.2f}"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import cProfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+
+ENV_VAR = "BUDGET_PROFILE"  # "1" records timings from startup, "cprofile" also writes a .pstats file per session
+
+
+class Profiler:
+    """Opt-in wall-time and call-count recorder for named hot paths.
+
+    Wrapped functions cost one attribute check while it is disabled. When a
+    pstats directory is given, a cProfile run covers the whole time it is enabled.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.stats = {}  # name -> [calls, total seconds, max seconds]
+        self._cprofile = None
+        self._pstats_dir = None
+
+    def enable(self, pstats_dir: Path = None):
+        self.enabled = True
+        if pstats_dir is not None and self._cprofile is None:
+            self._pstats_dir = pstats_dir
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def disable(self) -> Path:
+        """Stop recording; returns the .pstats file written, if cProfile was on."""
+        self.enabled = False
+        if self._cprofile is None:
+            return None
+        self._cprofile.disable()
+        self._pstats_dir.mkdir(parents=True, exist_ok=True)
+        path = self._pstats_dir / f"session-{datetime.now():%Y%m%d-%H%M%S}.pstats"
+        self._cprofile.dump_stats(str(path))
+        self._cprofile = None
+        return path
+
+    def record(self, name: str, seconds: float):
+        entry = self.stats.get(name)
+        if entry is None:
+            self.stats[name] = [1, seconds, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    @contextmanager
+    def measure(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - t0)
+
+    def timed(self, name: str):
+        def wrap(fn):
+            @wraps(fn)
+            def inner(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                t0 = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - t0)
+            return inner
+        return wrap
+
+    def rows(self) -> list:
+        """(name, calls, total ms, mean ms, max ms), slowest total first."""
+        out = [(name, calls, total * 1000, total * 1000 / calls, worst * 1000)
+               for name, (calls, total, worst) in self.stats.items()]
+        return sorted(out, key=lambda r: r[2], reverse=True)
+
+    def reset(self):
+        self.stats = {}
+
+
+profiler = Profiler()
@@ -0,0 +1,47 @@
+"""Rollup sidecar: a snapshot's per-month, per-category totals, saved next to it.
+
+budget_data.rollup holds {(month, type, category): total} for the rows in
+budget_data.csv (or .budget) together with that file's size and mtime, plus a
+checksum over its own contents. A rollup whose snapshot has since been replaced,
+or that fails the checksum, is ignored and the totals are computed from the rows.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+VERSION = 1
+
+
+def rollup_path(data_file: Path) -> Path:
+    return data_file.with_name(data_file.stem + ".rollup")
+
+
+def _checksum(body: dict) -> str:
+    return hashlib.sha256(json.dumps(body, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def write_rollup(data_file: Path, snapshot, groups: dict):
+    """Save groups as the totals of the snapshot whose fingerprint is snapshot (temp file + rename)."""
+    body = {
+        "version": VERSION,
+        "snapshot": snapshot,
+        "totals": [[m, t, c, amount] for (m, t, c), amount in groups.items()],
+    }
+    body["checksum"] = _checksum(body)
+    path = rollup_path(data_file)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(body), encoding="utf-8")  # a torn write only fails the checksum
+    os.replace(tmp, path)
+
+
+def read_rollup(data_file: Path, snapshot):
+    """The totals saved for snapshot, or None if the rollup is missing, stale or damaged."""
+    try:
+        body = json.loads(rollup_path(data_file).read_text(encoding="utf-8"))
+        checksum = body.pop("checksum")
+        if body.get("version") != VERSION or body.get("snapshot") != snapshot or checksum != _checksum(body):
+            return None
+        return {(m, t, c): amount for m, t, c, amount in body["totals"]}
+    except (OSError, ValueError, TypeError, KeyError, AttributeError):
+        return None
@@ -0,0 +1,68 @@
+COMPACT_MIN = 64  # tombstones tolerated before compaction is even considered
+
+
+class StableRows:
+    """Transactions with ids that never change, for use as Treeview iids.
+
+    delete() finds each row through the id -> position map and leaves a tombstone
+    (None) in its slot, so deleting k rows costs O(k). The tombstones are squeezed
+    out in one pass once they make up half the list.
+    """
+
+    def __init__(self):
+        self.rows = []  # tx dicts in insertion order, None where a row was deleted
+        self.ids = []  # id of the row in the same slot
+        self.pos = {}  # live id -> slot
+        self.next_id = 0
+        self.dead = 0
+
+    def __len__(self):
+        return len(self.pos)
+
+    def __iter__(self):
+        for tx in self.rows:
+            if tx is not None:
+                yield tx
+
+    def items(self):
+        for tx_id, tx in zip(self.ids, self.rows):
+            if tx is not None:
+                yield tx_id, tx
+
+    def get(self, tx_id: int) -> dict:
+        return self.rows[self.pos[tx_id]]
+
+    def add(self, tx: dict) -> int:
+        tx_id = self.next_id
+        self.next_id += 1
+        self.pos[tx_id] = len(self.rows)
+        self.rows.append(tx)
+        self.ids.append(tx_id)
+        return tx_id
+
+    def delete(self, tx_ids) -> list:
+        """Remove the given ids (unknown ones are ignored); returns the removed rows."""
+        removed = []
+        for tx_id in tx_ids:
+            slot = self.pos.pop(tx_id, None)
+            if slot is None:
+                continue
+            removed.append(self.rows[slot])
+            self.rows[slot] = None
+        self.dead += len(removed)
+        if self.dead > COMPACT_MIN and self.dead * 2 > len(self.rows):
+            self.compact()
+        return removed
+
+    def compact(self):
+        live = [(tx_id, tx) for tx_id, tx in zip(self.ids, self.rows) if tx is not None]
+        self.ids = [tx_id for tx_id, _ in live]
+        self.rows = [tx for _, tx in live]
+        self.pos = {tx_id: slot for slot, tx_id in enumerate(self.ids)}
+        self.dead = 0
+
+    def clear(self):
+        self.rows.clear()
+        self.ids.clear()
+        self.pos.clear()
+        self.dead = 0
@@ -0,0 +1,257 @@
+"""Search over ledger rows: note keywords, category, type, amount and date ranges.
+
+Query syntax (terms are ANDed):
+    coffee lunch                 notes containing both words
+    cat:Dining  type:expense
+    amount:10..50  amount:..20  amount:12.50
+    date:01-01-2024..03-31-2024  date:06-01-2024..
+"""
+import re
+from bisect import bisect_left, bisect_right, insort
+
+from budget_store import TransactionStore, date_ordinal
+
+WORD = re.compile(r"\w+")
+
+
+def note_words(note: str) -> frozenset:
+    return frozenset(WORD.findall(note.lower()))
+
+
+class Query:
+    def __init__(self, words=(), category=None, tx_type=None,
+                 amount_min=None, amount_max=None, date_min=None, date_max=None):
+        self.words = list(words)
+        self.category = category
+        self.tx_type = tx_type
+        self.amount_min = amount_min
+        self.amount_max = amount_max
+        self.date_min = date_min  # day ordinals, inclusive
+        self.date_max = date_max
+
+    def is_empty(self) -> bool:
+        return not self.words and all(v is None for v in (
+            self.category, self.tx_type, self.amount_min, self.amount_max, self.date_min, self.date_max))
+
+
+def _range(text: str, convert):
+    lo, sep, hi = text.partition("..")
+    if not sep:
+        value = convert(lo)
+        return value, value
+    return (convert(lo) if lo else None), (convert(hi) if hi else None)
+
+
+def _ordinal(text: str) -> int:
+    value = date_ordinal(text)
+    if value < 0:
+        raise ValueError(f"bad date {text!r} (use MM-DD-YYYY)")
+    return value
+
+
+def parse_query(text: str) -> Query:
+    """Parse the search box syntax above; raises ValueError."""
+    q = Query()
+    for term in text.split():
+        field, sep, value = term.partition(":")
+        field = field.lower()
+        if not sep or not value:
+            q.words.extend(WORD.findall(term.lower()))
+        elif field in ("cat", "category"):
+            q.category = value
+        elif field == "type":
+            q.tx_type = value.title()
+        elif field == "amount":
+            q.amount_min, q.amount_max = _range(value.replace("$", ""), float)
+        elif field == "date":
+            q.date_min, q.date_max = _range(value, _ordinal)
+        else:
+            raise ValueError(f"unknown search field {field!r}")
+    return q
+
+
+def _shift_after_delete(rows: list, removed: list):
+    start = bisect_left(rows, removed[0])
+    rows[start:] = [r - bisect_left(removed, r) for r in rows[start:]]
+
+
+def _shift_before_insert(rows: list, gaps: list):
+    start = bisect_left(rows, gaps[0])
+    rows[start:] = [r + bisect_right(gaps, r) for r in rows[start:]]
+
+
+class SearchIndex:
+    """Indexes over a TransactionStore, addressed by row index like the store itself.
+
+    words maps each note token to the sorted rows whose note has it and categories does
+    the same per category code; amounts and dates are row lists sorted by value (ties by
+    row) next to their sorted keys, for bisect range lookups. Built on the first search,
+    then kept current by the ledger through add/discard/delete/insert.
+    """
+
+    def __init__(self, store: TransactionStore):
+        self.store = store
+        self.built = False
+        self._words_of = {}  # note -> its tokens; notes repeat a lot
+
+    def invalidate(self):
+        self.built = False
+
+    def _tokens(self, note: str) -> frozenset:
+        words = self._words_of.get(note)
+        if words is None:
+            words = self._words_of[note] = note_words(note)
+        return words
+
+    def _ordinals(self, rows):
+        ordinals, codes = self.store.date_ordinals, self.store.date_codes
+        return [ordinals[codes[r]] for r in rows]
+
+    def build(self):
+        store = self.store
+        n = len(store)
+        words, words_of, findall = {}, self._words_of, WORD.findall
+        for row, note in enumerate(store.notes):
+            tokens = words_of.get(note)
+            if tokens is None:
+                tokens = words_of[note] = frozenset(findall(note.lower()))
+            for word in tokens:
+                postings = words.get(word)
+                if postings is None:
+                    words[word] = [row]
+                else:
+                    postings.append(row)
+        self.words = words
+        self.categories = {}
+        for row, code in enumerate(store.category_codes):
+            self.categories.setdefault(code, []).append(row)
+
+        amounts = store.amounts
+        self.amount_rows = sorted(range(n), key=amounts.__getitem__)  # stable sort: ties stay in row order
+        self.amount_keys = [amounts[r] for r in self.amount_rows]
+        ordinals = self._ordinals(range(n))
+        self.date_rows = sorted(range(n), key=ordinals.__getitem__)
+        self.date_keys = [ordinals[r] for r in self.date_rows]
+        self.built = True
+
+    # ---------- Incremental upkeep ----------
+    @staticmethod
+    def _sorted_add(keys: list, rows: list, key, row: int):
+        lo, hi = bisect_left(keys, key), bisect_right(keys, key)
+        pos = bisect_left(rows, row, lo, hi)
+        keys.insert(pos, key)
+        rows.insert(pos, row)
+
+    @staticmethod
+    def _sorted_discard(keys: list, rows: list, key, row: int):
+        lo, hi = bisect_left(keys, key), bisect_right(keys, key)
+        pos = bisect_left(rows, row, lo, hi)
+        del keys[pos]
+        del rows[pos]
+
+    def add(self, row: int):
+        """Index the row now stored at row (its neighbours must already be numbered around it)."""
+        if not self.built:
+            return
+        store = self.store
+        for word in self._tokens(store.notes[row]):
+            insort(self.words.setdefault(word, []), row)
+        insort(self.categories.setdefault(store.category_codes[row], []), row)
+        self._sorted_add(self.amount_keys, self.amount_rows, store.amounts[row], row)
+        self._sorted_add(self.date_keys, self.date_rows, store.ordinal(row), row)
+
+    def discard(self, row: int):
+        """Drop the row's entries; call before its contents change or it is deleted."""
+        if not self.built:
+            return
+        store = self.store
+        for word in self._tokens(store.notes[row]):
+            rows = self.words[word]
+            del rows[bisect_left(rows, row)]
+            if not rows:
+                del self.words[word]
+        rows = self.categories[store.category_codes[row]]
+        del rows[bisect_left(rows, row)]
+        self._sorted_discard(self.amount_keys, self.amount_rows, store.amounts[row], row)
+        self._sorted_discard(self.date_keys, self.date_rows, store.ordinal(row), row)
+
+    def delete(self, removed: list):
+        """Forget the (ascending) rows in removed and renumber the rest; call before the store deletes them."""
+        if not self.built:
+            return
+        for row in removed:
+            self.discard(row)
+        for rows in self.words.values():
+            _shift_after_delete(rows, removed)
+        for rows in self.categories.values():
+            _shift_after_delete(rows, removed)
+        # value-sorted lists are not row-sorted, so every entry is checked
+        first = removed[0]
+        self.amount_rows = [r - bisect_left(removed, r) if r > first else r for r in self.amount_rows]
+        self.date_rows = [r - bisect_left(removed, r) if r > first else r for r in self.date_rows]
+
+    def insert(self, inserted: list):
+        """Renumber for rows the store has just put back at the (ascending) indices in inserted, then index them."""
+        if not self.built:
+            return
+        gaps = [idx - j for j, idx in enumerate(inserted)]
+        for rows in self.words.values():
+            _shift_before_insert(rows, gaps)
+        for rows in self.categories.values():
+            _shift_before_insert(rows, gaps)
+        first = gaps[0]
+        self.amount_rows = [r + bisect_right(gaps, r) if r >= first else r for r in self.amount_rows]
+        self.date_rows = [r + bisect_right(gaps, r) if r >= first else r for r in self.date_rows]
+        for row in inserted:
+            self.add(row)
+
+    # ---------- Queries ----------
+    @staticmethod
+    def _key_range(keys: list, rows: list, lo, hi) -> list:
+        start = 0 if lo is None else bisect_left(keys, lo)
+        stop = len(keys) if hi is None else bisect_right(keys, hi)
+        return rows[start:stop]
+
+    def search(self, q: Query) -> list:
+        """Rows matching every term of q, in ascending row order."""
+        store = self.store
+        if q.is_empty():
+            return list(range(len(store)))
+        if not self.built:
+            self.build()
+
+        # Drive from the smallest candidate list, then check the other terms row by row
+        candidates = [(self.words.get(w, []), True) for w in q.words]
+        if q.category is not None:
+            code = store.categories.codes.get(q.category)
+            candidates.append((self.categories.get(code, []), True))
+        if q.amount_min is not None or q.amount_max is not None:
+            candidates.append((self._key_range(self.amount_keys, self.amount_rows, q.amount_min, q.amount_max), False))
+        if q.date_min is not None or q.date_max is not None:
+            candidates.append((self._key_range(self.date_keys, self.date_rows, q.date_min, q.date_max), False))
+        if candidates:
+            driver, in_row_order = min(candidates, key=lambda c: len(c[0]))
+            if not in_row_order:
+                driver = sorted(driver)
+        else:
+            driver = range(len(store))  # type: only
+
+        checks = []
+        if q.words:
+            words = set(q.words)
+            checks.append(lambda r: words <= self._tokens(store.notes[r]))
+        if q.category is not None:
+            code = store.categories.codes.get(q.category, -1)
+            checks.append(lambda r: store.category_codes[r] == code)
+        if q.tx_type is not None:
+            type_code = store.types.codes.get(q.tx_type, -1)
+            checks.append(lambda r: store.type_codes[r] == type_code)
+        if q.amount_min is not None:
+            checks.append(lambda r: store.amounts[r] >= q.amount_min)
+        if q.amount_max is not None:
+            checks.append(lambda r: store.amounts[r] <= q.amount_max)
+        if q.date_min is not None:
+            checks.append(lambda r: store.ordinal(r) >= q.date_min)
+        if q.date_max is not None:
+            checks.append(lambda r: store.ordinal(r) <= q.date_max)
+        return [r for r in driver if all(check(r) for check in checks)]
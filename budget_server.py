@@ -0,0 +1,245 @@
+"""Local HTTP/JSON API for the budget ledger, so several devices can share one.
+
+    python budget_server.py [--host 127.0.0.1] [--port 8765] [--data FILE] [--sqlite]
+
+    GET  /months                    months as MM-YYYY, newest first
+    GET  /totals?month=MM-YYYY      {"month", "income", "expenses", "balance"} (default "All")
+    POST /expenses                  {"date", "amount", "category", "note"} -> {"id"}
+    POST /income                    {"date", "amount"} -> {"id"}
+    POST /delete                    {"ids": [...]} -> {"deleted"}
+
+Dates are MM-DD-YYYY. Ids are what POST /expenses and /income returned: SQLite rowids
+with --sqlite, which never change, and otherwise row numbers as in the app. Row numbers
+shift down after every delete, by this server or anyone else, so an id held across
+someone else's delete can name a different row. A delete that arrives just after
+another process moved rows gets 409 Conflict; fetch fresh ids before retrying.
+
+Writes are queued and applied in batches (one journal fsync per batch); reads come
+from the ledger's in-memory totals, after a look for changes other processes made.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import traceback
+from http import HTTPStatus
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from budget_ledger import DATA_FILE, DB_FILE, BudgetLedger, LedgerChanged, make_tx, month_label, parse_month
+
+BATCH_MS = 5  # how long the writer waits for more requests before flushing a batch
+MAX_BODY = 1 << 20
+
+
+class HttpError(Exception):
+    def __init__(self, status: HTTPStatus, message: str = ""):
+        super().__init__(message or status.phrase)
+        self.status = status
+
+
+def _resolve(fut: asyncio.Future, result=None, error=None):
+    if fut.done():  # the request was cancelled (client gone, server stopping); the write still happened
+        return
+    if error is not None:
+        fut.set_exception(error)
+    else:
+        fut.set_result(result)
+
+
+class WriteBatcher:
+    """Serializes writes from every connection and applies them to the ledger in batches."""
+
+    def __init__(self, ledger: BudgetLedger, batch_ms: int = BATCH_MS):
+        self.ledger = ledger
+        self.batch_ms = batch_ms
+        self.queue = []  # (op, payload, future), in arrival order
+        self.wakeup = asyncio.Event()
+
+    def _submit(self, op: str, payload):
+        fut = asyncio.get_running_loop().create_future()
+        self.queue.append((op, payload, fut))
+        self.wakeup.set()
+        return fut
+
+    def add(self, tx: dict):
+        return self._submit("add", tx)
+
+    def delete(self, ids: list):
+        return self._submit("delete", ids)
+
+    async def run(self):
+        while True:
+            await self.wakeup.wait()
+            await asyncio.sleep(self.batch_ms / 1000)
+            self.wakeup.clear()
+            batch, self.queue = self.queue, []
+            self.flush(batch)
+
+    def flush(self, batch: list):
+        # consecutive adds become one add_many; a delete ends the run since it renumbers rows
+        i = 0
+        while i < len(batch):
+            op, payload, fut = batch[i]
+            if op == "delete":
+                try:
+                    ids = sorted(set(payload))
+                    self.ledger.delete(ids)  # checks the ids after catching up with other processes
+                    _resolve(fut, len(ids))
+                except KeyError as e:
+                    _resolve(fut, error=HttpError(HTTPStatus.NOT_FOUND, f"no such id: {e.args[0]}"))
+                except Exception as e:
+                    _resolve(fut, error=e)
+                i += 1
+                continue
+
+            j = i
+            while j < len(batch) and batch[j][0] == "add":
+                j += 1
+            try:
+                # other processes' rows are caught up on first, so the ids come from the ledger
+                ids = self.ledger.add_many([payload for _, payload, _ in batch[i:j]])
+                for tx_id, (_, _, fut) in zip(ids, batch[i:j]):
+                    _resolve(fut, tx_id)
+            except Exception as e:
+                for _, _, fut in batch[i:j]:
+                    _resolve(fut, error=e)
+            i = j
+
+
+class BudgetServer:
+    def __init__(self, ledger: BudgetLedger):
+        self.ledger = ledger
+        self.writer = WriteBatcher(ledger)
+        self.routes = {
+            ("GET", "/months"): self.get_months,
+            ("GET", "/totals"): self.get_totals,
+            ("POST", "/expenses"): self.post_expense,
+            ("POST", "/income"): self.post_income,
+            ("POST", "/delete"): self.post_delete,
+        }
+
+    # ---------- Endpoints ----------
+    async def get_months(self, query, body):
+        self.ledger.poll_changes()  # pick up what the app, the CLI or another server wrote
+        return HTTPStatus.OK, {"months": [month_label(m) for m in self.ledger.months()]}
+
+    async def get_totals(self, query, body):
+        label = query.get("month", ["All"])[0]
+        self.ledger.poll_changes()
+        income, expenses = self.ledger.totals("All" if label == "All" else parse_month(label))
+        return HTTPStatus.OK, {"month": label, "income": income, "expenses": expenses, "balance": income - expenses}
+
+    async def post_expense(self, query, body):
+        tx = make_tx(str(body.get("date", "")), "Expense", body.get("amount", ""),
+                     str(body.get("category", "Other")), str(body.get("note", "")))
+        return HTTPStatus.CREATED, {"id": await self.writer.add(tx)}
+
+    async def post_income(self, query, body):
+        tx = make_tx(str(body.get("date", "")), "Income", body.get("amount", ""))
+        return HTTPStatus.CREATED, {"id": await self.writer.add(tx)}
+
+    async def post_delete(self, query, body):
+        ids = body.get("ids")
+        if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "ids must be a list of ints")
+        return HTTPStatus.OK, {"deleted": await self.writer.delete(ids)}
+
+    # ---------- HTTP ----------
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                lines = head.decode("latin-1").split("\r\n")
+                method, target, version = lines[0].split(" ", 2)
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY:
+                    await self.respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "body too large"}, False)
+                    return
+                raw = await reader.readexactly(length) if length else b""
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                status, payload = await self.dispatch(method, target, raw)
+                await self.respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    return
+        except (ValueError, ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass  # malformed request or client gone; just drop the connection
+        finally:
+            writer.close()
+
+    async def dispatch(self, method: str, target: str, raw: bytes):
+        url = urlsplit(target)
+        handler = self.routes.get((method, url.path))
+        if handler is None:
+            known = any(path == url.path for _, path in self.routes)
+            status = HTTPStatus.METHOD_NOT_ALLOWED if known else HTTPStatus.NOT_FOUND
+            return status, {"error": status.phrase}
+        try:
+            body = json.loads(raw) if raw else {}
+            if not isinstance(body, dict):
+                raise ValueError("body must be a JSON object")
+            return await handler(parse_qs(url.query), body)
+        except HttpError as e:
+            return e.status, {"error": str(e)}
+        except LedgerChanged as e:
+            return HTTPStatus.CONFLICT, {"error": str(e)}
+        except (ValueError, TypeError) as e:
+            return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+        except Exception as e:  # e.g. an OSError writing the journal; the client still gets an answer
+            print(f"error: {method} {url.path}", file=sys.stderr)
+            traceback.print_exc()
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e) or type(e).__name__}
+
+    async def respond(self, writer: asyncio.StreamWriter, status: HTTPStatus, payload, keep_alive: bool):
+        body = json.dumps(payload).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def serve(self, host: str, port: int):
+        batcher = asyncio.create_task(self.writer.run())
+        server = await asyncio.start_server(self.handle, host, port)
+        bound = server.sockets[0].getsockname()[1]
+        print(f"listening on http://{host}:{bound}", flush=True)  # budget_loadtest.py reads the port from this line
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+            self.writer.flush(self.writer.queue)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Budget ledger HTTP/JSON server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765, help="0 picks a free port")
+    parser.add_argument("--data", type=Path, default=DATA_FILE)
+    parser.add_argument("--sqlite", action="store_true", help=f"use the SQLite ledger next to --data (default {DB_FILE})")
+    args = parser.parse_args(argv)
+
+    ledger = BudgetLedger(args.data, args.data.with_suffix(".db") if args.sqlite else None)
+    ledger.load()
+    try:
+        asyncio.run(BudgetServer(ledger).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ledger.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
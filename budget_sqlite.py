@@ -0,0 +1,254 @@
+import sqlite3
+from pathlib import Path
+
+from budget_store import date_ordinal
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    month INTEGER NOT NULL,  -- year * 12 + month - 1, see budget_ledger.month_key
+    type TEXT NOT NULL,
+    amount REAL NOT NULL,
+    category TEXT NOT NULL,
+    note TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_tx_date ON transactions(date);
+-- (month, type, amount) covers the totals query without touching the table
+CREATE INDEX IF NOT EXISTS idx_tx_month ON transactions(month, type, amount);
+CREATE INDEX IF NOT EXISTS idx_tx_category ON transactions(month, category);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+# Files written before month became an integer kept a text slice of the date there; the
+# table is rebuilt once with the month recomputed by the Python month_key().
+MIGRATE_TEXT_MONTH = """
+BEGIN;
+DROP INDEX IF EXISTS idx_tx_date;
+DROP INDEX IF EXISTS idx_tx_month;
+DROP INDEX IF EXISTS idx_tx_category;
+ALTER TABLE transactions RENAME TO transactions_text_month;
+""" + SCHEMA + """
+INSERT INTO transactions (id, date, month, type, amount, category, note)
+    SELECT id, date, month_key(date), type, amount, category, note FROM transactions_text_month;
+DROP TABLE transactions_text_month;
+COMMIT;
+"""
+
+COLUMNS = "date, type, amount, category, note"
+FETCH_CHUNK = 500  # ids per IN (...) query, under SQLite's bound-parameter limit
+
+
+def _tx(row) -> dict:
+    return {"date": row[0], "type": row[1], "amount": row[2], "category": row[3], "note": row[4]}
+
+
+class IdView:
+    """Lazy, ordered list of transaction ids for one month (or "All"), backed by indexed queries."""
+
+    def __init__(self, conn: sqlite3.Connection, month):
+        self.conn = conn
+        if month == "All":
+            self.where, self.params = "", ()
+        else:
+            self.where, self.params = "WHERE month = ?", (month,)
+        self._len = None
+
+    def __len__(self):
+        if self._len is None:
+            self._len = self.conn.execute(f"SELECT COUNT(*) FROM transactions {self.where}", self.params).fetchone()[0]
+        return self._len
+
+    def __iter__(self):
+        # streamed straight off the cursor, never materialized as a list
+        for (tx_id,) in self.conn.execute(f"SELECT id FROM transactions {self.where} ORDER BY id", self.params):
+            yield tx_id
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, _ = item.indices(len(self))
+            if stop <= start:
+                return []
+            sql = f"SELECT id FROM transactions {self.where} ORDER BY id LIMIT ? OFFSET ?"
+            return [r[0] for r in self.conn.execute(sql, self.params + (stop - start, start))]
+        rows = self[item:item + 1] if item >= 0 else self[len(self) + item:len(self) + item + 1]
+        if not rows:
+            raise IndexError(item)
+        return rows[0]
+
+
+class SqliteStore:
+    """Transactions kept in an SQLite file, indexed by date, month and category."""
+
+    def __init__(self, db_file: Path, month_key):
+        self.db_file = db_file
+        self.month_key = month_key  # same date -> month function the UI uses
+        self.conn = sqlite3.connect(str(db_file))
+        self.conn.executescript(SCHEMA)
+        columns = {name: decl for _, name, decl, *_ in self.conn.execute("PRAGMA table_info(transactions)")}
+        if columns["month"].upper() == "TEXT":
+            self.conn.create_function("month_key", 1, month_key, deterministic=True)
+            self.conn.executescript(MIGRATE_TEXT_MONTH)
+        self._data_version = self._read_data_version()
+
+    def _read_data_version(self) -> int:
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def changed_elsewhere(self) -> bool:
+        """True if another connection committed since the last call."""
+        version = self._read_data_version()
+        changed, self._data_version = version != self._data_version, version
+        return changed
+
+    # ---------- Row access (mirrors self.transactions[i]) ----------
+    def __getitem__(self, tx_id: int) -> dict:
+        row = self.conn.execute(f"SELECT {COLUMNS} FROM transactions WHERE id = ?", (tx_id,)).fetchone()
+        if row is None:
+            raise KeyError(tx_id)
+        return _tx(row)
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+
+    def __iter__(self):
+        for row in self.conn.execute(f"SELECT {COLUMNS} FROM transactions ORDER BY id"):
+            yield _tx(row)
+
+    def rows(self, ids):
+        """Yield (id, tx) for ids, fetched FETCH_CHUNK at a time and kept in the given order."""
+        ids = list(ids)
+        for start in range(0, len(ids), FETCH_CHUNK):
+            chunk = ids[start:start + FETCH_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            found = {
+                row[0]: _tx(row[1:])
+                for row in self.conn.execute(f"SELECT id, {COLUMNS} FROM transactions WHERE id IN ({marks})", chunk)
+            }
+            for tx_id in chunk:
+                if tx_id in found:
+                    yield tx_id, found[tx_id]
+
+    # ---------- Queries ----------
+    def ids(self, month) -> IdView:
+        return IdView(self.conn, month)
+
+    def months(self) -> list:
+        return [r[0] for r in self.conn.execute("SELECT DISTINCT month FROM transactions ORDER BY month DESC")]
+
+    def totals(self, month):
+        """Return (income, expenses) for a month, or for everything when month is "All"."""
+        if month == "All":
+            cur = self.conn.execute("SELECT type, SUM(amount) FROM transactions GROUP BY type")
+        else:
+            cur = self.conn.execute("SELECT type, SUM(amount) FROM transactions WHERE month = ? GROUP BY type", (month,))
+        sums = dict(cur.fetchall())
+        return sums.get("Income") or 0.0, sums.get("Expense") or 0.0
+
+    def category_totals(self, month) -> dict:
+        """Return {(type, category): amount} for a month, or for everything when month is "All"."""
+        if month == "All":
+            cur = self.conn.execute("SELECT type, category, SUM(amount) FROM transactions GROUP BY type, category")
+        else:
+            cur = self.conn.execute(
+                "SELECT type, category, SUM(amount) FROM transactions WHERE month = ? GROUP BY type, category", (month,)
+            )
+        return {(t, c): amount for t, c, amount in cur}
+
+    def add_rows(self, rows) -> int:
+        """add_many() for (date, type, amount, category, note) tuples."""
+        with self.conn:
+            cur = self.conn.executemany(
+                "INSERT INTO transactions (date, month, type, amount, category, note) VALUES (?, ?, ?, ?, ?, ?)",
+                ((r[0], self.month_key(r[0])) + tuple(r[1:]) for r in rows),
+            )
+        return cur.rowcount
+
+    def search(self, q) -> list:
+        """Ids matching a budget_search.Query; notes match by substring, dates are checked in Python."""
+        where, params = [], []
+        for word in q.words:
+            where.append("note LIKE ?")
+            params.append(f"%{word}%")
+        for column, op, value in (
+            ("category", "=", q.category), ("type", "=", q.tx_type),
+            ("amount", ">=", q.amount_min), ("amount", "<=", q.amount_max),
+        ):
+            if value is not None:
+                where.append(f"{column} {op} ?")
+                params.append(value)
+        sql = "SELECT id, date FROM transactions" + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY id"
+        lo = q.date_min if q.date_min is not None else float("-inf")
+        hi = q.date_max if q.date_max is not None else float("inf")
+        return [tx_id for tx_id, date in self.conn.execute(sql, params) if lo <= date_ordinal(date) <= hi]
+
+    # ---------- Mutations (each one is its own committed transaction) ----------
+    def _values(self, tx: dict) -> tuple:
+        return (tx["date"], self.month_key(tx["date"]), tx["type"], tx["amount"], tx["category"], tx["note"])
+
+    def add(self, tx: dict) -> int:
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO transactions (date, month, type, amount, category, note) VALUES (?, ?, ?, ?, ?, ?)",
+                self._values(tx),
+            )
+        return cur.lastrowid
+
+    def add_many(self, txs) -> range:
+        """Insert txs in one transaction; returns the ids they got."""
+        with self.conn:
+            # rowids are handed out as MAX(id) + 1, so one batch gets consecutive ids; the write
+            # lock is taken before reading MAX(id), so no other connection can insert in between
+            self.conn.execute("BEGIN IMMEDIATE")
+            first = self.conn.execute("SELECT IFNULL(MAX(id), 0) + 1 FROM transactions").fetchone()[0]
+            cur = self.conn.executemany(
+                "INSERT INTO transactions (date, month, type, amount, category, note) VALUES (?, ?, ?, ?, ?, ?)",
+                (self._values(tx) for tx in txs),
+            )
+        return range(first, first + cur.rowcount)
+
+    def insert_rows(self, ids, txs):
+        """Put deleted rows back under their old ids (undo); raises KeyError if one has been reused."""
+        try:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT INTO transactions (id, date, month, type, amount, category, note) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    ((tx_id,) + self._values(tx) for tx_id, tx in zip(ids, txs)),
+                )
+        except sqlite3.IntegrityError as e:
+            raise KeyError("id already in use") from e  # nothing was inserted
+
+    def update(self, tx_id: int, tx: dict):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE transactions SET date = ?, month = ?, type = ?, amount = ?, category = ?, note = ? WHERE id = ?",
+                self._values(tx) + (tx_id,),
+            )
+
+    def delete(self, ids):
+        with self.conn:
+            self.conn.executemany("DELETE FROM transactions WHERE id = ?", ((i,) for i in ids))
+
+    # ---------- One-shot import of the file ledger ----------
+    def needs_migration(self) -> bool:
+        """True until migrate() has run, unless the table already had rows (files made before it existed)."""
+        done = self.conn.execute("SELECT 1 FROM meta WHERE key = 'migrated'").fetchone()
+        return done is None and self.conn.execute("SELECT 1 FROM transactions LIMIT 1").fetchone() is None
+
+    def migrate(self, txs) -> int:
+        """Copy txs in and mark the import done, all in one transaction; returns the rows copied.
+
+        If anything fails nothing is kept, so the next open tries again.
+        """
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")  # another process may be migrating the same file
+            if not self.needs_migration():
+                return 0
+            cur = self.conn.executemany(
+                "INSERT INTO transactions (date, month, type, amount, category, note) VALUES (?, ?, ?, ?, ?, ?)",
+                (self._values(tx) for tx in txs),
+            )
+            self.conn.execute("INSERT INTO meta (key, value) VALUES ('migrated', datetime('now'))")
+        return max(cur.rowcount, 0)
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,218 @@
+import csv
+import sys
+from array import array
+from datetime import date, datetime
+
+
+class CodeTable:
+    """Maps repeated strings to small ints and back."""
+
+    def __init__(self, values=()):
+        self.values = []
+        self.codes = {}
+        for v in values:
+            self.code(v)
+
+    def code(self, value: str) -> int:
+        c = self.codes.get(value)
+        if c is None:
+            c = len(self.values)
+            self.values.append(value)
+            self.codes[value] = c
+        return c
+
+    def copy(self):
+        other = CodeTable()
+        other.values = list(self.values)
+        other.codes = dict(self.codes)
+        return other
+
+
+def date_ordinal(date_str: str) -> int:
+    """Day number of an MM-DD-YYYY (or YYYY-MM-DD) date, or -1 if it is neither."""
+    for fmt in ("%m-%d-%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(date_str, fmt).toordinal()
+        except ValueError:
+            pass
+    return -1
+
+
+def ordinal_month(ordinal: int) -> int:
+    """Month number (year * 12 + month - 1) of a date_ordinal() day, or -1 for an unparsed date."""
+    if ordinal < 0:
+        return -1
+    day = date.fromordinal(ordinal)
+    return day.year * 12 + day.month - 1
+
+
+# ---------- CSV rows ----------
+def csv_tx(r: dict) -> dict:
+    """Transaction dict for a row of a budget_data.csv DictReader."""
+    return {
+        "date": r["date"],
+        "type": r["type"],
+        "amount": float(r["amount"]),
+        "category": r["category"],
+        "note": r["note"],
+    }
+
+
+def read_csv(path, transactions):
+    """Append every row of the budget CSV at path to transactions."""
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        for r in csv.DictReader(f):
+            transactions.append(csv_tx(r))
+
+
+def _without(column, indices):
+    # one pass: copy the runs between removed slots
+    out = column[:0]
+    prev = 0
+    for i in indices:
+        out.extend(column[prev:i])
+        prev = i + 1
+    out.extend(column[prev:])
+    return out
+
+
+def _spliced(column, indices, values):
+    # one pass: values land at their final (ascending) positions, the old rows fill the gaps
+    out = column[:0]
+    src = 0
+    for pos, value in zip(indices, values):
+        take = pos - len(out)
+        out.extend(column[src:src + take])
+        src += take
+        out.append(value)
+    out.extend(column[src:])
+    return out
+
+
+class TransactionStore:
+    """Column-per-field transaction storage with the same row access as a list of dicts.
+
+    Amounts live in an array('d'); dates, types and categories are small-int codes into
+    CodeTables (each distinct date also keeps its ordinal and month number, parsed once
+    when the date is first seen); notes are interned strings.
+    Indexing returns a fresh dict, so edits must assign a whole row back.
+    """
+
+    def __init__(self):
+        self.amounts = array("d")
+        self.date_codes = array("l")
+        self.type_codes = array("b")
+        self.category_codes = array("h")
+        self.notes = []
+
+        self.dates = CodeTable()
+        self.date_ordinals = array("l")  # date code -> ordinal
+        self.date_months = array("l")  # date code -> year * 12 + month - 1
+        self.types = CodeTable(["Income", "Expense"])
+        self.categories = CodeTable()
+
+    # ---------- Encoding ----------
+    def date_code(self, date_str: str) -> int:
+        c = self.dates.code(date_str)
+        if c == len(self.date_ordinals):
+            ordinal = date_ordinal(date_str)
+            self.date_ordinals.append(ordinal)
+            self.date_months.append(ordinal_month(ordinal))
+        return c
+
+    def _row(self, i: int) -> dict:
+        return {
+            "date": self.dates.values[self.date_codes[i]],
+            "type": self.types.values[self.type_codes[i]],
+            "amount": self.amounts[i],
+            "category": self.categories.values[self.category_codes[i]],
+            "note": self.notes[i],
+        }
+
+    def ordinal(self, i: int) -> int:
+        return self.date_ordinals[self.date_codes[i]]
+
+    def month(self, i: int) -> int:
+        return self.date_months[self.date_codes[i]]
+
+    # ---------- list-like API ----------
+    def __len__(self):
+        return len(self.amounts)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._row(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("transaction index out of range")
+        return self._row(i)
+
+    def __setitem__(self, i: int, tx: dict):
+        self.amounts[i] = float(tx["amount"])
+        self.date_codes[i] = self.date_code(tx["date"])
+        self.type_codes[i] = self.types.code(tx["type"])
+        self.category_codes[i] = self.categories.code(tx["category"])
+        self.notes[i] = sys.intern(tx["note"])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._row(i)
+
+    def append(self, tx: dict):
+        self.append_fields(tx["date"], tx["type"], tx["amount"], tx["category"], tx["note"])
+
+    def append_fields(self, date: str, tx_type: str, amount: float, category: str, note: str):
+        """append() for callers that already have the five values, without a dict per row."""
+        self.amounts.append(float(amount))
+        self.date_codes.append(self.date_code(date))
+        self.type_codes.append(self.types.code(tx_type))
+        self.category_codes.append(self.categories.code(category))
+        self.notes.append(sys.intern(note))
+
+    def extend(self, txs):
+        for tx in txs:
+            self.append(tx)
+
+    def truncate(self, n: int):
+        """Drop every row from index n on."""
+        for column in (self.amounts, self.date_codes, self.type_codes, self.category_codes, self.notes):
+            del column[n:]
+
+    def delete_many(self, indices):
+        """Remove rows at ascending indices in O(n + k), rather than one pop per row."""
+        self.amounts = _without(self.amounts, indices)
+        self.date_codes = _without(self.date_codes, indices)
+        self.type_codes = _without(self.type_codes, indices)
+        self.category_codes = _without(self.category_codes, indices)
+        self.notes = _without(self.notes, indices)
+
+    def insert_many(self, indices, txs):
+        """Put txs back so they end up at the given ascending indices (the inverse of delete_many)."""
+        txs = list(txs)
+        self.amounts = _spliced(self.amounts, indices, [float(tx["amount"]) for tx in txs])
+        self.date_codes = _spliced(self.date_codes, indices, [self.date_code(tx["date"]) for tx in txs])
+        self.type_codes = _spliced(self.type_codes, indices, [self.types.code(tx["type"]) for tx in txs])
+        self.category_codes = _spliced(self.category_codes, indices, [self.categories.code(tx["category"]) for tx in txs])
+        self.notes = _spliced(self.notes, indices, [sys.intern(tx["note"]) for tx in txs])
+
+    def clear(self):
+        # keep the code tables; codes stay valid and most values come back on reload
+        for column in (self.amounts, self.date_codes, self.type_codes, self.category_codes):
+            del column[:]
+        self.notes.clear()
+
+    def copy(self):
+        """Cheap point-in-time copy (array memcpy), e.g. for a background snapshot writer."""
+        other = TransactionStore.__new__(TransactionStore)
+        other.amounts = array("d", self.amounts)
+        other.date_codes = array("l", self.date_codes)
+        other.type_codes = array("b", self.type_codes)
+        other.category_codes = array("h", self.category_codes)
+        other.notes = list(self.notes)
+        other.dates = self.dates.copy()
+        other.date_ordinals = array("l", self.date_ordinals)
+        other.date_months = array("l", self.date_months)
+        other.types = self.types.copy()
+        other.categories = self.categories.copy()
+        return other